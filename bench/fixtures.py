@@ -0,0 +1,211 @@
+"""Synthetic QWeather payloads for the offline mock server."""
+from datetime import datetime, timedelta, timezone
+import zlib
+
+# 与和风天气返回格式一致的时区（东八区）
+CST = timezone(timedelta(hours=8))
+
+INDEX_NAMES = {
+    "1": "运动指数", "2": "洗车指数", "3": "穿衣指数", "4": "钓鱼指数",
+    "5": "紫外线指数", "6": "旅游指数", "7": "花粉过敏指数", "8": "舒适度指数",
+    "9": "感冒指数", "10": "空气污染扩散条件指数", "11": "空调开启指数", "12": "太阳镜指数",
+    "13": "化妆指数", "14": "晾晒指数", "15": "交通指数", "16": "防晒指数",
+}
+
+def _time(moment):
+    """Format a datetime like the API does."""
+    return moment.strftime("%Y-%m-%dT%H:%M+08:00")
+
+def _seed(location):
+    """Derive a small deterministic offset from a location ID."""
+    return sum(ord(char) for char in location) % 10
+
+def _now_payload(location, moment):
+    seed = _seed(location)
+    return {
+        "now": {
+            "obsTime": _time(moment),
+            "temp": str(15 + seed),
+            "feelsLike": str(14 + seed),
+            "icon": "100",
+            "text": "晴",
+            "wind360": str(seed * 36),
+            "windDir": "北风",
+            "windScale": "2",
+            "windSpeed": str(8 + seed),
+            "humidity": str(40 + seed),
+            "precip": "0.0",
+            "pressure": str(1010 + seed),
+            "vis": "16",
+            "cloud": "10",
+            "dew": "5",
+        },
+        "refer": {"sources": ["QWeather"], "license": ["QWeather Developers License"]},
+    }
+
+def _daily_payload(location, moment):
+    seed = _seed(location)
+    return {
+        "daily": [
+            {
+                "fxDate": (moment + timedelta(days=day)).strftime("%Y-%m-%d"),
+                "tempMax": str(22 + seed - day % 3),
+                "tempMin": str(10 + seed - day % 2),
+                "textDay": "多云" if day % 2 else "晴",
+                "textNight": "晴",
+                "wind360Day": "90",
+                "windSpeedDay": "12",
+                "humidity": str(50 + day),
+                "precip": "0.0",
+                "pressure": "1012",
+                "uvIndex": "5",
+            }
+            for day in range(7)
+        ],
+    }
+
+def _hourly_payload(location, moment, hours):
+    seed = _seed(location)
+    start = moment.replace(minute=0, second=0, microsecond=0)
+    return {
+        "hourly": [
+            {
+                "fxTime": _time(start + timedelta(hours=hour)),
+                "temp": str(15 + seed + hour % 6),
+                "text": "晴",
+                "wind360": "45",
+                "windSpeed": "10",
+                "humidity": "55",
+                "pop": str(hour % 5 * 10),
+                "precip": "0.0",
+                "pressure": "1011",
+                "cloud": "20",
+                "dew": "6",
+            }
+            for hour in range(hours)
+        ],
+    }
+
+def _minutely_payload(location, moment):
+    # 偶数种子的位置半小时后开始下雨，其余无降水
+    rain_from = 6 if _seed(location) % 2 == 0 else None
+    start = moment.replace(second=0, microsecond=0) - timedelta(minutes=moment.minute % 5)
+    return {
+        "summary": "30分钟后开始下雨" if rain_from is not None else "未来两小时无降水",
+        "minutely": [
+            {
+                "fxTime": _time(start + timedelta(minutes=5 * slot)),
+                "precip": "0.15" if rain_from is not None and slot >= rain_from else "0.00",
+                "type": "rain",
+            }
+            for slot in range(24)
+        ],
+    }
+
+def _lookup_payload(location):
+    """Resolve "lon,lat" to a deterministic city ID, like GeoAPI city lookup."""
+    try:
+        longitude, latitude = location.split(",")
+    except ValueError:
+        return {"code": "400"}
+    city = zlib.crc32(location.encode()) % 1000000
+    return {
+        "code": "200",
+        "location": [
+            {
+                "name": f"城市{city}",
+                "id": f"101{city:06d}",
+                "lat": latitude,
+                "lon": longitude,
+                "tz": "Asia/Shanghai",
+                "type": "city",
+            }
+        ],
+        "refer": {"sources": ["QWeather"], "license": ["QWeather Developers License"]},
+    }
+
+def _warning_payload(location, moment):
+    if _seed(location) % 3:
+        return {"warning": []}
+    return {
+        "warning": [
+            {
+                "id": f"{location}-{moment:%Y%m%d}-wind",
+                "sender": "气象台",
+                "pubTime": _time(moment),
+                "title": "大风蓝色预警",
+                "startTime": _time(moment),
+                "endTime": _time(moment + timedelta(hours=12)),
+                "status": "active",
+                "level": "",
+                "severity": "Minor",
+                "severityColor": "Blue",
+                "type": "1006",
+                "typeName": "大风",
+                "text": "预计未来24小时内可能出现平均风力6级以上大风，请注意防范。",
+            }
+        ],
+    }
+
+def _air_payload(location, moment):
+    seed = _seed(location)
+    return {
+        "now": {
+            "pubTime": _time(moment),
+            "aqi": str(40 + seed * 5),
+            "level": "1",
+            "category": "优",
+            "primary": "NA",
+            "pm10": str(30 + seed),
+            "pm2p5": str(15 + seed),
+            "no2": "20",
+            "so2": "5",
+            "co": "0.6",
+            "o3": "70",
+        },
+    }
+
+def _indices_payload(location, moment):
+    return {
+        "daily": [
+            {
+                "date": moment.strftime("%Y-%m-%d"),
+                "type": index_type,
+                "name": name,
+                "level": "2",
+                "category": "较适宜",
+                "text": f"{name}较适宜，天气较好，可适当安排户外活动。",
+            }
+            for index_type, name in INDEX_NAMES.items()
+        ],
+    }
+
+def build_payload(path, location, moment=None):
+    """Return the payload body for an API path, or None for unknown paths."""
+    moment = moment or datetime.now(CST)
+    if path == "/v2/city/lookup":
+        return _lookup_payload(location)
+    # 格点天气与城市天气的返回格式相同，按经纬度生成
+    if path.startswith("/v7/grid-weather/"):
+        path = "/v7/weather/" + path[len("/v7/grid-weather/"):]
+    if path == "/v7/weather/now":
+        body = _now_payload(location, moment)
+    elif path == "/v7/weather/7d":
+        body = _daily_payload(location, moment)
+    elif path.startswith("/v7/weather/") and path.endswith("h"):
+        try:
+            hours = int(path[len("/v7/weather/"):-1])
+        except ValueError:
+            return None
+        body = _hourly_payload(location, moment, hours)
+    elif path == "/v7/minutely/5m":
+        body = _minutely_payload(location, moment)
+    elif path == "/v7/warning/now":
+        body = _warning_payload(location, moment)
+    elif path == "/v7/air/now":
+        body = _air_payload(location, moment)
+    elif path == "/v7/indices/1d":
+        body = _indices_payload(location, moment)
+    else:
+        return None
+    return {"code": "200", "updateTime": _time(moment), "fxLink": "", **body}
@@ -0,0 +1,169 @@
+"""Offline stand-in for the QWeather v7 API.
+
+Serves every endpoint the integration requests with synthetic or fixture
+payloads, and can inject latency, HTTP errors and quota errors::
+
+    python bench/mock_server.py --port 8080 --latency 0.05 --error-rate 0.01
+
+Then set the integration's API host to ``http://127.0.0.1:8080``.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from aiohttp import web
+
+from fixtures import CST, build_payload
+
+class MockQWeatherServer:
+    """Local aiohttp server mimicking the QWeather v7 API."""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, quota_rate=0.0,
+                 fixtures_dir=None, etag=True, churn=False, seed=None):
+        """Initialize the server.
+
+        ``latency``/``jitter`` are seconds added to every response,
+        ``error_rate`` is the share of HTTP 500 responses and ``quota_rate``
+        the share of ``code: "402"`` bodies. ``fixtures_dir`` holds JSON files
+        named after the API path (``weather_now.json`` for ``/v7/weather/now``)
+        that replace the synthetic payloads. ``churn`` advances ``updateTime``
+        on every response so that each fetch looks like new data.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.quota_rate = quota_rate
+        self.fixtures_dir = Path(fixtures_dir) if fixtures_dir else None
+        self.etag = etag
+        self.churn = churn
+        self._random = random.Random(seed)
+        self._started = datetime.now(CST)
+        self._runner = None
+        self.requests = 0
+        self.bytes_sent = 0
+        self.errors_injected = 0
+        self.quota_injected = 0
+        self.not_modified = 0
+
+    def _fixture(self, path):
+        """Return a fixture payload for a path, if one exists."""
+        if self.fixtures_dir is None:
+            return None
+        fixture = self.fixtures_dir / (path.strip("/").replace("v7/", "", 1).replace("/", "_") + ".json")
+        if not fixture.is_file():
+            return None
+        return json.loads(fixture.read_text(encoding="utf-8"))
+
+    def _moment(self):
+        """Return the time reported as updateTime."""
+        if self.churn:
+            # 每次响应推进一分钟，使updateTime不断变化
+            return self._started + timedelta(minutes=self.requests)
+        return self._started
+
+    async def _handle(self, request):
+        """Serve one API request."""
+        self.requests += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+
+        if not request.query.get("key"):
+            return web.json_response({"code": "401"})
+        if self._random.random() < self.error_rate:
+            self.errors_injected += 1
+            raise web.HTTPInternalServerError()
+        if self._random.random() < self.quota_rate:
+            self.quota_injected += 1
+            return web.json_response({"code": "402"})
+
+        location = request.query.get("location", "")
+        payload = self._fixture(request.path) or build_payload(request.path, location, self._moment())
+        if payload is None:
+            raise web.HTTPNotFound()
+
+        body = json.dumps(payload, ensure_ascii=False).encode()
+        headers = {}
+        if self.etag:
+            tag = f'"{hashlib.md5(body).hexdigest()}"'
+            if request.headers.get("If-None-Match") == tag:
+                self.not_modified += 1
+                return web.Response(status=304, headers={"ETag": tag})
+            headers["ETag"] = tag
+
+        response = web.Response(body=body, content_type="application/json", headers=headers)
+        response.enable_compression()
+        self.bytes_sent += len(body)
+        return response
+
+    def stats(self):
+        """Return the server-side counters."""
+        return {
+            "requests": self.requests,
+            "bytes_sent": self.bytes_sent,
+            "errors_injected": self.errors_injected,
+            "quota_injected": self.quota_injected,
+            "not_modified": self.not_modified,
+        }
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Start serving; return the base URL to use as the API host."""
+        app = web.Application()
+        app.router.add_get("/v7/{tail:.*}", self._handle)
+        # GeoAPI 城市查询，跟踪模式下的位置解析
+        app.router.add_get("/v2/city/lookup", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+async def _serve(args):
+    server = MockQWeatherServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        quota_rate=args.quota_rate,
+        fixtures_dir=args.fixtures,
+        etag=not args.no_etag,
+        churn=args.churn,
+        seed=args.seed,
+    )
+    base_url = await server.start(args.host, args.port)
+    print(f"Mock QWeather API listening on {base_url}", file=sys.stderr)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+def add_server_arguments(parser):
+    """Add the mock server options to an argument parser."""
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra seconds (0..jitter)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of HTTP 500 responses")
+    parser.add_argument("--quota-rate", type=float, default=0.0, help='share of code "402" responses')
+    parser.add_argument("--fixtures", help="directory of JSON payload fixtures")
+    parser.add_argument("--no-etag", action="store_true", help="do not send ETag / 304 responses")
+    parser.add_argument("--churn", action="store_true", help="advance updateTime on every response")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for injected faults")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    add_server_arguments(parser)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,249 @@
+"""End-to-end benchmark for the HeWeather integration.
+
+Starts the offline mock API, then for each location count drives
+``HeWeatherCoordinator._async_update_data`` for every city and reads every
+``HeWeatherSensor`` and ``HeWeatherEntity``. Reports refresh throughput,
+p50/p99 refresh latency, memory per city and entity read cost::
+
+    python bench/run.py --locations 1,10,100 --rounds 5 --latency 0.02
+
+Requires Home Assistant to be installed in the running interpreter.
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path[:0] = [str(BENCH_DIR.parent), str(BENCH_DIR)]
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.heweather_v7_key import HeWeatherCoordinator  # noqa: E402
+from custom_components.heweather_v7_key.broker import async_get_broker  # noqa: E402
+from custom_components.heweather_v7_key.geo import (  # noqa: E402
+    async_get_geo_cache,
+    cell_coordinates,
+    geohash_encode
+)
+from custom_components.heweather_v7_key.const import (  # noqa: E402
+    DOMAIN,
+    SENSOR_TYPES,
+    BATCH_MAX_CONCURRENT_REFRESHES,
+    ATTRIBUTE_PROFILES,
+    DEFAULT_ATTRIBUTE_PROFILE
+)
+from custom_components.heweather_v7_key.sensor import HeWeatherSensor  # noqa: E402
+from custom_components.heweather_v7_key.session import async_close_session  # noqa: E402
+from custom_components.heweather_v7_key.weather import HeWeatherEntity  # noqa: E402
+from mock_server import MockQWeatherServer, add_server_arguments  # noqa: E402
+
+def _percentile(values, fraction):
+    """Return the nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+async def _refresh_all(coordinators, latencies):
+    """Refresh every coordinator once, as the batch scheduler would."""
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENT_REFRESHES)
+
+    async def refresh(coordinator):
+        async with semaphore:
+            # 强制所有接口到期，测量完整的刷新路径
+            coordinator._next_due.clear()
+            start = time.perf_counter()
+            data = await coordinator._async_update_data()
+            coordinator.async_set_updated_data(data)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(refresh(coordinator) for coordinator in coordinators))
+
+async def _read_entities(entities, weather_entities):
+    """Read every property Home Assistant reads when writing state."""
+    reads = 0
+    for entity in entities:
+        entity.available
+        entity.native_value
+        entity.extra_state_attributes
+        reads += 1
+    for entity in weather_entities:
+        entity.available
+        entity.condition
+        entity.native_temperature
+        entity.humidity
+        entity.extra_state_attributes
+        await entity.async_forecast_daily()
+        await entity.async_forecast_hourly()
+        reads += 1
+    return reads
+
+def _coordinates(index):
+    """Return distinct "lon,lat" coordinates for a benchmark city."""
+    return f"{116 + index % 20 * 0.1:.2f},{39 + index // 20 * 0.1:.2f}"
+
+async def run_scenario(base_url, locations, rounds, read_rounds, profile=DEFAULT_ATTRIBUTE_PROFILE,
+                       minutely=False, grid=False):
+    """Benchmark one location count; return a result dict.
+
+    minutely enables the nowcast endpoint; grid resolves each city through
+    the GeoAPI lookup and switches it to the grid weather endpoints.
+    """
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hass.data[DOMAIN] = {}
+        # 关闭响应缓存，每轮都经过完整的网络请求路径
+        async_get_broker(hass).cache_ttl = 0
+
+        baseline, _ = tracemalloc.get_traced_memory()
+        coordinators = [
+            HeWeatherCoordinator(
+                hass, base_url, "bench", f"101{index:06d}", 900,
+                minutely_location=_coordinates(index) if minutely else None,
+                grid_weather=grid
+            )
+            for index in range(locations)
+        ]
+        if grid:
+            geo_cache = async_get_geo_cache(hass)
+            for index, coordinator in enumerate(coordinators):
+                longitude, latitude = (float(value) for value in _coordinates(index).split(","))
+                cell = geohash_encode(latitude, longitude)
+                location = await geo_cache.async_resolve(cell, base_url, "bench")
+                await coordinator.async_set_location(location, cell_coordinates(cell))
+
+        latencies = []
+        await _refresh_all(coordinators, latencies)
+        retained, _ = tracemalloc.get_traced_memory()
+        first_refresh = latencies[:]
+        latencies.clear()
+
+        tracemalloc.reset_peak()
+        start_memory, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await _refresh_all(coordinators, latencies)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+
+        entities = []
+        weather_entities = []
+        for coordinator in coordinators:
+            for sensor_type, sensor_config in SENSOR_TYPES.items():
+                entity = HeWeatherSensor(
+                    coordinator, None, sensor_type, sensor_config, coordinator.location, profile=profile
+                )
+                entity.hass = hass
+                entities.append(entity)
+            entity = HeWeatherEntity(coordinator, None, coordinator.location, profile=profile)
+            entity.hass = hass
+            weather_entities.append(entity)
+
+        reads = 0
+        read_start = time.perf_counter()
+        for _ in range(read_rounds):
+            reads += await _read_entities(entities, weather_entities)
+        read_elapsed = time.perf_counter() - read_start
+
+        broker = async_get_broker(hass)
+        result = {
+            "locations": locations,
+            "entities": len(entities) + len(weather_entities),
+            "refreshes": len(latencies),
+            "throughput": len(latencies) / elapsed if elapsed else 0.0,
+            "first_p50_ms": _percentile(first_refresh, 0.5) * 1000,
+            "p50_ms": _percentile(latencies, 0.5) * 1000,
+            "p99_ms": _percentile(latencies, 0.99) * 1000,
+            "network_requests": broker.network_requests,
+            "kb_per_city": (retained - baseline) / locations / 1024,
+            "peak_alloc_kb_per_round": (peak - start_memory) / rounds / 1024 if rounds else 0.0,
+            "read_us": read_elapsed / reads * 1e6 if reads else 0.0,
+        }
+
+        for coordinator in coordinators:
+            await coordinator.async_shutdown()
+        await async_close_session(hass)
+        return result
+
+COLUMNS = (
+    ("locations", "cities", "{:d}"),
+    ("entities", "entities", "{:d}"),
+    ("refreshes", "refreshes", "{:d}"),
+    ("throughput", "refresh/s", "{:.1f}"),
+    ("first_p50_ms", "first p50 ms", "{:.1f}"),
+    ("p50_ms", "p50 ms", "{:.1f}"),
+    ("p99_ms", "p99 ms", "{:.1f}"),
+    ("network_requests", "requests", "{:d}"),
+    ("kb_per_city", "KiB/city", "{:.1f}"),
+    ("peak_alloc_kb_per_round", "peak KiB/round", "{:.1f}"),
+    ("read_us", "read us/entity", "{:.1f}"),
+)
+
+def format_results(results, server_stats):
+    """Render the results as a plain-text table."""
+    header = [title for _, title, _ in COLUMNS]
+    rows = [[fmt.format(result[key]) for key, _, fmt in COLUMNS] for result in results]
+    widths = [max(len(cell) for cell in column) for column in zip(header, *rows)]
+    lines = ["  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in [header, *rows]]
+    lines.append("server: " + ", ".join(f"{key}={value}" for key, value in server_stats.items()))
+    return "\n".join(lines)
+
+async def main(args):
+    server = MockQWeatherServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        quota_rate=args.quota_rate,
+        fixtures_dir=args.fixtures,
+        etag=not args.no_etag,
+        churn=args.churn,
+        seed=args.seed,
+    )
+    base_url = await server.start()
+    tracemalloc.start()
+    try:
+        results = [
+            await run_scenario(
+                base_url, locations, args.rounds, args.reads, args.attribute_profile,
+                args.minutely, args.grid
+            )
+            for locations in args.locations
+        ]
+    finally:
+        tracemalloc.stop()
+        await server.stop()
+
+    report = format_results(results, server.stats())
+    print(report)
+    if args.output:
+        Path(args.output).write_text(report + "\n", encoding="utf-8")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--locations",
+        type=lambda value: [int(item) for item in value.split(",")],
+        default=[1, 10, 100],
+        help="comma-separated location counts (default: 1,10,100)"
+    )
+    parser.add_argument("--rounds", type=int, default=5, help="timed refresh rounds per scenario")
+    parser.add_argument("--reads", type=int, default=20, help="entity read rounds per scenario")
+    parser.add_argument(
+        "--attribute-profile",
+        choices=ATTRIBUTE_PROFILES,
+        default=DEFAULT_ATTRIBUTE_PROFILE,
+        help="entity attribute profile (default: standard)"
+    )
+    parser.add_argument("--minutely", action="store_true", help="also request the minutely nowcast")
+    parser.add_argument(
+        "--grid",
+        action="store_true",
+        help="resolve cities through the GeoAPI lookup and use the grid weather endpoints"
+    )
+    parser.add_argument("--output", help="also write the report to this file")
+    add_server_arguments(parser)
+    asyncio.run(main(parser.parse_args()))
@@ -1,69 +1,420 @@
 """The HeWeather integration."""
 import asyncio
 import logging
+import math
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 import aiohttp
-import async_timeout
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryError
+from homeassistant.helpers import issue_registry as ir
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from homeassistant.helpers.event import async_track_time_interval
 
 from .const import (
     DOMAIN, 
+    split_locations,
+    DATA_BROKER,
+    DATA_BREAKERS,
+    DATA_STARTUP,
+    STARTUP_JITTER,
+    CONFIG_ERROR_CODES,
+    AUTH_ERROR_CODES,
+    NON_RETRYABLE_CODES,
+    CONF_MINUTELY,
+    DEFAULT_MINUTELY,
+    CONF_TRACKED_ENTITY,
+    CONF_GRID_WEATHER,
+    CONF_ENDPOINTS,
+    CONF_SENSORS,
+    CONF_WEATHER_ENTITY,
+    DEFAULT_WEATHER_ENTITY,
+    ENDPOINT_GROUPS,
+    SENSOR_TYPES,
+    WEATHER_ENDPOINTS,
+    CONF_GEO_API_HOST,
+    DEFAULT_GEO_API_HOST,
+    GRID_ENDPOINTS,
+    EVENT_RAIN_START,
+    EVENT_RAIN_END,
+    EVENT_WARNING,
+    SIGNAL_WARNING_ADDED,
+    SIGNAL_WARNING_CHANGED,
     CONF_API_HOST, 
     CONF_API_KEY, 
     CONF_LOCATION,
+    CONF_NAME,
     CONF_UPDATE_INTERVAL,
+    CONF_MAX_CONCURRENT_REQUESTS,
     DEFAULT_API_HOST,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    CONF_ENDPOINT_INTERVALS,
+    DEFAULT_ENDPOINT_INTERVALS,
+    SCHEDULER_TICK,
+    BATCH_MAX_CONCURRENT_REFRESHES,
+    CONF_DAILY_QUOTA,
+    DEFAULT_DAILY_QUOTA,
+    CONF_HOURLY_HOURS,
+    DEFAULT_HOURLY_HOURS,
+    CONF_ADAPTIVE_INTERVAL,
+    DEFAULT_ADAPTIVE_INTERVAL,
+    MAX_INTERVAL_STRETCH,
+    RETRY_ATTEMPTS,
     API_ENDPOINTS  # 确保导入API_ENDPOINTS
 )
+from .broker import async_get_broker
+from .forecast import HourlyForecastStore
+from .geo import HeWeatherLocationTracker
+from .warnings import WarningIndex
+from .history import HeWeatherHistory
+from .nowcast import PrecipitationNowcast
+from .metrics import HeWeatherMetrics
+from .adaptive import PublishRateTracker
+from .models import PARSERS
+from .ratelimit import QuotaExceeded, async_get_rate_limiter
+from .retry import async_get_breakers, backoff_delay
+from .session import async_close_session
+from .startup import async_get_startup_scheduler, entry_phase
+from .store import HeWeatherSnapshotStore
 
 _LOGGER = logging.getLogger(__name__)
 
 class HeWeatherCoordinator(DataUpdateCoordinator):
     """Class to manage fetching HeWeather data."""
     
-    def __init__(self, hass, api_host, api_key, location, update_interval):
+    def __init__(self, hass, api_host, api_key, location, update_interval,
+                 max_concurrent_requests=DEFAULT_MAX_CONCURRENT_REQUESTS,
+                 endpoint_intervals=None, snapshot_store=None, rate_limiter=None,
+                 hourly_hours=DEFAULT_HOURLY_HOURS, adaptive_interval=DEFAULT_ADAPTIVE_INTERVAL,
+                 minutely_location=None, grid_weather=False, location_key=None,
+                 endpoints=None):
         """Initialize global HeWeather updater."""
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
             update_interval=None,  # Disable built-in scheduler
+            always_update=False,  # 数据未变化时不通知实体
         )
         self.api_host = api_host
+        # 主机可带协议前缀（如本地模拟服务器 http://127.0.0.1:8080），默认使用https
+        self.api_base = api_host if "://" in api_host else f"https://{api_host}"
         self.api_key = api_key
         self.location = location
+        # 实体唯一ID使用的稳定标识；跟踪模式下位置会变化，使用被跟踪的实体ID
+        self.location_key = location_key or location
+        # 跟踪模式下当前格点的经纬度（"经度,纬度"），启用格点天气时使用
+        self.grid_weather = grid_weather
+        self.grid_location = None
         self.data = {}
         self._total_api_calls = 0
         self._successful_api_calls = 0
         self._update_lock = asyncio.Lock()
         self._unsub_schedule = None
+        # 后台首次刷新任务，卸载时取消
+        self._initial_refresh_task = None
         self._last_update_time = None
         self._next_update_time = None
         
         # 使用配置的更新间隔（秒）
         self.update_interval_seconds = update_interval
         self.scan_interval_seconds = update_interval  # 别名
+        self.max_concurrent_requests = max(1, int(max_concurrent_requests))
 
-    async def async_start(self):
-        """Start periodic updates."""
+        # 启用的接口及实际请求路径：未选择的接口从不请求；逐小时预报按配置的时长
+        # 选择接口，分钟级降水仅在提供经纬度时启用
+        self.minutely_location = minutely_location
+        self.endpoint_paths = {
+            endpoint_name: endpoint_path
+            for endpoint_name, endpoint_path in API_ENDPOINTS.items()
+            if (endpoint_name == "minutely" and minutely_location)
+            or (endpoint_name != "minutely" and (endpoints is None or endpoint_name in endpoints))
+        }
+        if "hourly" in self.endpoint_paths:
+            self.endpoint_paths["hourly"] = f"/v7/weather/{hourly_hours}h"
+
+        # 每个接口独立的更新间隔（秒），未配置的接口使用全局更新间隔
+        self.endpoint_intervals = {
+            endpoint_name: (endpoint_intervals or {}).get(endpoint_name, update_interval)
+            for endpoint_name in self.endpoint_paths
+        }
+        self._next_due = {}
+        # 被限流的接口预计可获得令牌的等待时间（秒）
+        self._retry_after = {}
+        # 按各接口 updateTime 的实际变化频率安排下一次请求
+        self.publish_trackers = {
+            endpoint_name: PublishRateTracker() for endpoint_name in self.endpoint_paths
+        } if adaptive_interval else None
+        self.hourly_store = HourlyForecastStore(hourly_hours)
+        # 实时天气与空气质量数值字段的历史，用于趋势类派生传感器
+        self.history = HeWeatherHistory()
+        # 分钟级降水序列与降雨开始/结束检测
+        self.nowcast = PrecipitationNowcast()
+        # 按ID索引的有效预警，用于计算每次刷新的新增/更新/解除
+        self.warning_index = WarningIndex()
+        # 调度相位（0~1），用于把多个协调器的请求错开分布在更新间隔内
+        self.phase = 0.0
+        self._changed_endpoints = None
+        # 最近一次原始响应，仅用于判断响应是否为同一对象以及写入快照
+        self._raw = {}
+        self._snapshot_store = snapshot_store
+        self.rate_limiter = rate_limiter
+        # 传输统计：下载字节数、304节省字节数、跳过的解析次数等
+        self.transfer_stats = {
+            "bytes_downloaded": 0,
+            "bytes_saved": 0,
+            "not_modified": 0,
+            "parses_skipped": 0,
+            "unchanged_update_time": 0,
+        }
+        # 最近一次认证/配置错误码，成功请求后清除
+        self.config_error = None
+        # 热路径指标：延迟直方图、重试、解析与通知耗时
+        self.metrics = HeWeatherMetrics()
+
+    async def async_load_snapshot(self):
+        """Load the last saved payloads as stale data; return True if found."""
+        if self._snapshot_store is None:
+            return False
+
+        endpoints, saved_at = await self._snapshot_store.async_load()
+        if not endpoints:
+            return False
+
+        records = {}
+        for endpoint_name, payload in endpoints.items():
+            if endpoint_name not in self.endpoint_paths:
+                continue
+            try:
+                records[endpoint_name] = PARSERS[endpoint_name](payload)
+            except Exception as err:
+                _LOGGER.debug("Ignoring cached %s data: %s", endpoint_name, err)
+                continue
+            self._raw[endpoint_name] = payload
+        if not records:
+            return False
+
+        self.data = {
+            **records,
+            "last_update": saved_at or "",
+            "stale": True,
+        }
+        if "hourly" in records:
+            self.hourly_store.merge(records["hourly"].hours)
+        for endpoint_name in self.history.series:
+            if endpoint_name in records:
+                self.history.record(endpoint_name, records[endpoint_name])
+        if "minutely" in records:
+            # 快照中的降水序列不再触发事件
+            self.nowcast.merge(records["minutely"])
+        if "warning" in records:
+            # 快照中的预警作为已知预警，不再触发事件
+            self.warning_index.update(records["warning"].warnings)
+        _LOGGER.info("Loaded cached HeWeather data for %s: %s", self.location, ", ".join(endpoints))
+        return True
+
+    async def async_start(self, wait=True, schedule=True):
+        """Start periodic updates.
+
+        With schedule=False neither the timer nor the first refresh is
+        started; a batch coordinator drives the updates instead.
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.async_register_demand(self, self.endpoint_intervals)
+
+        if not schedule:
+            return
+
+        startup = async_get_startup_scheduler(self.hass)
         if self._unsub_schedule is None:
-            self._unsub_schedule = async_track_time_interval(
-                self.hass, 
-                self._scheduled_update, 
-                timedelta(seconds=self.update_interval_seconds)
+            tick = min((SCHEDULER_TICK, *self.endpoint_intervals.values()))
+            # 定时器按相位错开，避免各条目在同一时刻触发
+            self._unsub_schedule = startup.async_track_phased_interval(
+                self._scheduled_update,
+                timedelta(seconds=tick),
+                self.phase
             )
-            minutes = self.update_interval_seconds // 60
-            seconds = self.update_interval_seconds % 60
-            _LOGGER.info("Scheduled updates every %d min %d sec", minutes, seconds)
+            _LOGGER.info("Scheduled endpoint updates: %s", self.endpoint_intervals)
         
-        await self.async_refresh()
+        if wait:
+            await startup.async_initial_refresh(self.async_refresh)
+        else:
+            # 首次网络刷新在后台进行；已有快照数据时随机延迟以错开请求
+            self._initial_refresh_task = self.hass.async_create_background_task(
+                startup.async_initial_refresh(
+                    self._scheduled_update,
+                    STARTUP_JITTER if self.data else 0
+                ),
+                f"{DOMAIN} initial refresh {self.location}"
+            )
+
+    def _effective_interval(self, endpoint_name):
+        """Return the refresh interval after quota planning (inf = paused)."""
+        interval = self.endpoint_intervals[endpoint_name]
+        if self.rate_limiter is None:
+            return interval
+        return interval * self.rate_limiter.endpoint_scale(endpoint_name)
+
+    def _due_endpoints(self):
+        """Return the endpoints whose refresh interval has elapsed."""
+        now = time.monotonic()
+        return [
+            endpoint_name for endpoint_name in self.endpoint_paths
+            if self._next_due.get(endpoint_name, 0) <= now
+            and (endpoint_name not in self.data or self._effective_interval(endpoint_name) != math.inf)
+        ]
+
+    @callback
+    def async_update_listeners(self):
+        """Notify only the listeners whose endpoints changed in the last update.
+
+        A listener's context is the set of data types it reads; listeners
+        without a context, and all listeners after an availability change,
+        are always notified.
+        """
+        changed = self._changed_endpoints
+        self._changed_endpoints = None
+        start = time.perf_counter()
+        notified = 0
+        for update_callback, context in list(self._listeners.values()):
+            if changed is None or context is None or not changed.isdisjoint(context):
+                update_callback()
+                notified += 1
+        self.metrics.record_fanout(time.perf_counter() - start, notified)
+
+    @callback
+    def _async_set_config_error(self, code):
+        """Raise or clear a repair issue for an authentication/configuration error."""
+        if code == self.config_error:
+            return
+        self.config_error = code
+        issue_id = f"config_error_{self.location}"
+        if code is None:
+            ir.async_delete_issue(self.hass, DOMAIN, issue_id)
+            return
+        ir.async_create_issue(
+            self.hass,
+            DOMAIN,
+            issue_id,
+            is_fixable=False,
+            severity=ir.IssueSeverity.ERROR,
+            translation_key="config_error",
+            translation_placeholders={"location": self.location, "code": code},
+        )
+        # API密钥被拒绝时提示用户重新输入
+        if code in AUTH_ERROR_CODES and self.config_entry is not None:
+            self.config_entry.async_start_reauth(self.hass)
+
+    def _request_location(self, endpoint_name):
+        """Return the location query value for an endpoint."""
+        if endpoint_name == "minutely":
+            return self.minutely_location
+        if self.grid_location is not None and endpoint_name in GRID_ENDPOINTS:
+            return self.grid_location
+        return self.location
+
+    async def async_set_location(self, location, coordinates):
+        """Move to another location (tracking mode) and refresh everything."""
+        grid_changed = self.grid_weather and coordinates != self.grid_location
+        if location == self.location and not grid_changed:
+            # 城市模式下在同一城市内移动：只更新分钟级降水的坐标，下一轮请求该接口
+            if self.minutely_location is not None and coordinates != self.minutely_location:
+                self.minutely_location = coordinates
+                self._next_due.pop("minutely", None)
+            return
+        _LOGGER.info("Moving %s to location %s (%s)", self.location_key, location, coordinates)
+        location_changed = location != self.location
+        self.location = location
+        if self.grid_weather:
+            self.grid_location = coordinates
+            for endpoint_name, endpoint_path in GRID_ENDPOINTS.items():
+                if endpoint_name in self.endpoint_paths:
+                    self.endpoint_paths[endpoint_name] = endpoint_path
+        if self.minutely_location is not None:
+            self.minutely_location = coordinates
+        # 城市变化时历史重新开始；降水序列随坐标重新开始；所有接口立即刷新
+        if location_changed:
+            self.history = HeWeatherHistory()
+        self.nowcast = PrecipitationNowcast()
+        self._next_due.clear()
+        async with self._update_lock:
+            await self.async_refresh()
+
+    @callback
+    def _async_fire_nowcast_events(self, transitions):
+        """Fire rain start/end events for nowcast transitions."""
+        for event, timestamp in transitions:
+            self.hass.bus.async_fire(
+                EVENT_RAIN_START if event == "rain_start" else EVENT_RAIN_END,
+                {
+                    "location": self.location,
+                    "time": datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+                    "minutes": max(0, round((timestamp - time.time()) / 60)),
+                    "summary": self.nowcast.summary,
+                }
+            )
+
+    @callback
+    def _async_dispatch_warnings(self, added, updated, removed):
+        """Fire one event per warning change and notify the per-warning entities."""
+        for action, warnings in (("added", added), ("updated", updated), ("removed", removed)):
+            for warning in warnings:
+                self.hass.bus.async_fire(EVENT_WARNING, {
+                    "location": self.location,
+                    "action": action,
+                    "id": warning.id,
+                    "title": warning.title,
+                    "type": warning.type,
+                    "type_name": warning.type_name,
+                    "level": warning.level,
+                    "severity": warning.severity,
+                    "severity_color": warning.severity_color,
+                    "start_time": warning.start_time,
+                    "end_time": warning.end_time,
+                    "text": warning.text,
+                })
+                if action != "added":
+                    async_dispatcher_send(
+                        self.hass,
+                        SIGNAL_WARNING_CHANGED.format(self.location_key, warning.id),
+                        warning if action == "updated" else None
+                    )
+        if added:
+            async_dispatcher_send(self.hass, SIGNAL_WARNING_ADDED.format(self.location_key), added)
+
+    def publish_periods(self):
+        """Return the learned publish period (seconds) of each endpoint."""
+        if self.publish_trackers is None:
+            return {}
+        return {
+            endpoint_name: round(tracker.period)
+            for endpoint_name, tracker in self.publish_trackers.items()
+            if tracker.period is not None
+        }
+
+    def metric_value(self, name):
+        """Return one metric for the diagnostic sensors."""
+        metrics = self.metrics
+        if name == "latency_p95":
+            latency = metrics.latency_quantile(0.95)
+            return None if latency is None or latency == math.inf else round(latency * 1000)
+        if name == "retries":
+            return sum(metrics.retries.values())
+        if name == "bytes_downloaded":
+            return self.transfer_stats.get("bytes_downloaded", 0)
+        if name == "parse_ms":
+            return round((metrics.parse_seconds + self.transfer_stats.get("json_parse_seconds", 0.0)) * 1000, 1)
+        if name == "fanout_ms":
+            return round(metrics.fanout_seconds * 1000, 1)
+        if name == "cache_hit_rate":
+            return metrics.cache_hit_rate(self.transfer_stats)
+        if name == "quota_remaining":
+            return self.rate_limiter.remaining_today if self.rate_limiter is not None else None
+        return None
 
     async def async_shutdown(self):
         """Shutdown coordinator."""
@@ -71,9 +422,16 @@ class HeWeatherCoordinator(DataUpdateCoordinator):
             self._unsub_schedule()
             self._unsub_schedule = None
             _LOGGER.debug("Cancelled scheduled updates")
+        if self._initial_refresh_task is not None:
+            self._initial_refresh_task.cancel()
+            self._initial_refresh_task = None
+        if self.rate_limiter is not None:
+            self.rate_limiter.async_unregister_demand(self)
 
     async def _scheduled_update(self, _now=None):
         """Scheduled update with lock."""
+        if self._update_lock.locked() or not self._due_endpoints():
+            return
         async with self._update_lock:
             try:
                 _LOGGER.debug("Executing scheduled update")
@@ -81,111 +439,431 @@ class HeWeatherCoordinator(DataUpdateCoordinator):
             except Exception as err:
                 _LOGGER.error("Error during scheduled update: %s", err, exc_info=True)
 
+    async def _async_fetch_endpoint(self, endpoint_name, endpoint_path, semaphore):
+        """Fetch a single endpoint with retries, falling back to cached data."""
+        url = f"{self.api_base}{endpoint_path}?location={self._request_location(endpoint_name)}&key={self.api_key}"
+        if endpoint_name == "indices":
+            url += "&type=0"
+
+        start_time = time.time()
+        endpoint_data = None
+        attempts = 0
+        successful_calls = 0
+        broker = async_get_broker(self.hass)
+        breakers = async_get_breakers(self.hass)
+
+        for attempt in range(RETRY_ATTEMPTS):
+            if not breakers.allow_request(self.api_host, endpoint_path):
+                # 熔断期间不请求，直接使用缓存数据
+                _LOGGER.debug("Circuit open for %s, skipping request", endpoint_name)
+                break
+
+            attempts += 1
+            if attempt:
+                self.metrics.record_retry(endpoint_name)
+            try:
+                _LOGGER.debug("Requesting %s (attempt %d)", endpoint_name, attempt + 1)
+                async with semaphore:
+                    request_start = time.perf_counter()
+                    try:
+                        result = await broker.async_get_json(
+                            url, self.rate_limiter, stats=self.transfer_stats
+                        )
+                    finally:
+                        self.metrics.observe_latency(endpoint_name, time.perf_counter() - request_start)
+
+                code = result.get("code")
+                if code in CONFIG_ERROR_CODES:
+                    # 认证或配置错误不会因重试而恢复
+                    _LOGGER.error("%s rejected for location %s: API code %s", endpoint_name, self.location, code)
+                    self._async_set_config_error(code)
+                    breakers.release(self.api_host, endpoint_path)
+                    break
+                if code in NON_RETRYABLE_CODES:
+                    # 该位置无数据或账号受限，与接口是否正常无关
+                    _LOGGER.warning("%s unavailable for location %s: API code %s", endpoint_name, self.location, code)
+                    breakers.release(self.api_host, endpoint_path)
+                    break
+                if code != "200":
+                    raise UpdateFailed(f"API error: {result.get('message')}")
+
+                if "updateTime" not in result:
+                    raise UpdateFailed("Missing updateTime in response")
+
+                # 与上次相同的响应对象无需重新解析
+                if result is self._raw.get(endpoint_name) and endpoint_name in self.data:
+                    endpoint_data = self.data[endpoint_name]
+                else:
+                    parse_start = time.perf_counter()
+                    endpoint_data = PARSERS[endpoint_name](result)
+                    self.metrics.record_parse(time.perf_counter() - parse_start)
+                    self._raw[endpoint_name] = result
+                successful_calls += 1
+                self._async_set_config_error(None)
+                breakers.record_success(self.api_host, endpoint_path)
+                _LOGGER.debug("Successfully updated %s", endpoint_name)
+                break
+            except QuotaExceeded as err:
+                # 配额不足时不再重试，直接使用缓存数据；限流时推迟到预计有令牌时再请求
+                _LOGGER.warning("Skipping %s: %s", endpoint_name, err)
+                breakers.release(self.api_host, endpoint_path)
+                if err.retry_after is not None:
+                    self._retry_after[endpoint_name] = err.retry_after
+                break
+            except Exception as err:
+                self.metrics.record_failure(endpoint_name)
+                # 只有网络错误、超时和5xx计入熔断；其他接口错误只与本位置有关
+                if isinstance(err, aiohttp.ClientResponseError):
+                    if err.status >= 500:
+                        breakers.record_failure(self.api_host, endpoint_path, host_failure=False)
+                    else:
+                        breakers.release(self.api_host, endpoint_path)
+                elif isinstance(err, (aiohttp.ClientError, asyncio.TimeoutError)):
+                    breakers.record_failure(self.api_host, endpoint_path, host_failure=True)
+                else:
+                    breakers.release(self.api_host, endpoint_path)
+                if attempt == RETRY_ATTEMPTS - 1:
+                    _LOGGER.warning("Failed to update %s after %d attempts: %s",
+                                  endpoint_name, RETRY_ATTEMPTS, str(err))
+                    break
+                # 指数退避加全抖动，避免各协调器同步重试
+                await asyncio.sleep(backoff_delay(attempt))
+
+        if endpoint_data is None and endpoint_name in self.data:
+            endpoint_data = self.data[endpoint_name]
+            _LOGGER.debug("Using cached data for %s", endpoint_name)
+
+        return endpoint_name, endpoint_data, attempts, successful_calls, time.time() - start_time
+
     async def _async_update_data(self):
         """Fetch data from API endpoints."""
         start_time = time.time()
-        new_data = {}
+        due_endpoints = self._due_endpoints()
+        new_data = {
+            endpoint_name: self.data[endpoint_name]
+            for endpoint_name in self.endpoint_paths
+            if endpoint_name in self.data
+        }
         successful_calls = 0
         attempts = 0
-        
-        _LOGGER.info("Starting data update for HeWeather")
-        
-        # 确保使用从const导入的API_ENDPOINTS
-        for endpoint_name, endpoint_path in API_ENDPOINTS.items():
-            url = f"https://{self.api_host}{endpoint_path}?location={self.location}&key={self.api_key}"
-            if endpoint_name == "indices":
-                url += "&type=0"
-            
-            endpoint_data = None
-            for attempt in range(3):
-                attempts += 1
-                try:
-                    _LOGGER.debug("Requesting %s (attempt %d)", endpoint_name, attempt + 1)
-                    async with async_timeout.timeout(15):
-                        async with aiohttp.ClientSession() as session:
-                            async with session.get(url) as response:
-                                response.raise_for_status()
-                                result = await response.json()
-                                
-                                if result.get("code") != "200":
-                                    raise UpdateFailed(f"API error: {result.get('message')}")
-                                
-                                if "updateTime" not in result:
-                                    raise UpdateFailed("Missing updateTime in response")
-                                
-                                endpoint_data = result
-                                successful_calls += 1
-                                _LOGGER.debug("Successfully updated %s", endpoint_name)
-                                break
-                except Exception as err:
-                    if attempt == 2:
-                        _LOGGER.warning("Failed to update %s after 3 attempts: %s", 
-                                      endpoint_name, str(err))
-                        if endpoint_name in self.data:
-                            endpoint_data = self.data[endpoint_name]
-                            _LOGGER.debug("Using cached data for %s", endpoint_name)
-                    continue
-            
-            if endpoint_data:
+        endpoint_durations = dict(self.data.get("endpoint_durations", {}))
+        changed = []
+
+        _LOGGER.info("Starting data update for HeWeather: %s", ", ".join(due_endpoints))
+
+        # 仅请求已到期的接口，并发执行，由信号量限制同时进行的请求数
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        results = await asyncio.gather(*(
+            self._async_fetch_endpoint(endpoint_name, self.endpoint_paths[endpoint_name], semaphore)
+            for endpoint_name in due_endpoints
+        ))
+
+        now = time.monotonic()
+        for endpoint_name, endpoint_data, endpoint_attempts, endpoint_successes, duration in results:
+            attempts += endpoint_attempts
+            successful_calls += endpoint_successes
+            endpoint_durations[endpoint_name] = round(duration, 3)
+            interval = min(
+                self._effective_interval(endpoint_name),
+                self.endpoint_intervals[endpoint_name] * MAX_INTERVAL_STRETCH
+            )
+            tracker = self.publish_trackers[endpoint_name] if self.publish_trackers is not None else None
+            if tracker is not None and endpoint_successes:
+                tracker.observe(endpoint_data.update_time)
+            if not endpoint_successes:
+                # 未取得新数据（重试用尽、配额不足、熔断、配置错误）时不等待完整间隔，
+                # 按基础更新间隔尽快重试
+                interval = min(self.endpoint_intervals[endpoint_name], self.update_interval_seconds)
+                if endpoint_name in self._retry_after:
+                    interval = min(interval, self._retry_after.pop(endpoint_name))
+            elif endpoint_name not in self._next_due:
+                # 首次请求后按相位提前下一次请求，使各协调器错开
+                interval *= 1 - self.phase
+            elif tracker is not None:
+                # 配置的间隔为上限，在预计发布时间之后尽快请求
+                interval = tracker.next_delay(interval, time.time(), self.phase)
+            self._next_due[endpoint_name] = now + interval
+            previous = self.data.get(endpoint_name)
+            # 未变化的响应与上次是同一对象，无需逐字段比较
+            if endpoint_data and endpoint_data is not previous and endpoint_data != previous:
                 new_data[endpoint_name] = endpoint_data
+                changed.append(endpoint_name)
 
         # Update statistics
         self._total_api_calls += attempts
         self._successful_api_calls += successful_calls
         self._last_update_time = datetime.now()
-        self._next_update_time = datetime.now() + timedelta(seconds=self.update_interval_seconds)
+        next_in = max(0, min(self._next_due.values(), default=now) - now)
+        self._next_update_time = self._last_update_time + timedelta(seconds=next_in)
+
+        _LOGGER.info(
+            "Update completed. Success: %d/%d, Changed: %s, Total API calls: %d, Duration: %.2fs, Next in %d sec",
+            successful_calls,
+            len(due_endpoints),
+            ", ".join(changed) or "none",
+            self._total_api_calls,
+            time.time() - start_time,
+            next_in
+        )
+
+        # 数据未变化时返回原对象，协调器不会通知监听者（可用性变化时通知全部）
+        if not changed and self.data and (not self.data.get("stale") or not successful_calls):
+            self._changed_endpoints = None
+            return self.data
+
+        # 本次变化的接口集合；快照数据首次被刷新时所有实体都需更新
+        if self.data.get("stale"):
+            self._changed_endpoints = None
+        else:
+            self._changed_endpoints = {*changed, "meta"}
         
         # 仅保留必要信息
         new_data.update({
             "last_update": self._last_update_time.isoformat(),
             "next_update": self._next_update_time.isoformat(),
             "update_duration": time.time() - start_time,
+            "endpoint_durations": endpoint_durations,
+            "stale": not successful_calls,
         })
-        
-        minutes = self.update_interval_seconds // 60
-        seconds = self.update_interval_seconds % 60
-        _LOGGER.info(
-            "Update completed. Success: %d/%d, Total API calls: %d, Duration: %.2fs, Next in %d min %d sec",
-            successful_calls,
-            len(API_ENDPOINTS),
-            self._total_api_calls,
-            new_data["update_duration"],
-            minutes,
-            seconds
-        )
+
+        if "hourly" in changed:
+            self.hourly_store.merge(new_data["hourly"].hours)
+        for endpoint_name in self.history.series:
+            if endpoint_name in changed:
+                self.history.record(endpoint_name, new_data[endpoint_name])
+        if "minutely" in changed:
+            self._async_fire_nowcast_events(self.nowcast.merge(new_data["minutely"]))
+        if "warning" in changed:
+            self._async_dispatch_warnings(*self.warning_index.update(new_data["warning"].warnings))
+
+        if changed and self._snapshot_store is not None:
+            self._snapshot_store.async_schedule_save(self._raw)
         
         return new_data
 
+class HeWeatherBatchCoordinator:
+    """Drive the coordinators of several locations from one scheduler."""
+
+    def __init__(self, hass, coordinators, phase=0.0):
+        """Initialize the batch coordinator."""
+        self.hass = hass
+        self.coordinators = coordinators
+        self.phase = phase
+        self._unsub_schedule = None
+        # 后台首次刷新任务，卸载时取消
+        self._initial_refresh_task = None
+        self._semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENT_REFRESHES)
+
+        # 相位均匀分布，使各城市的请求错开在更新间隔内
+        for index, coordinator in enumerate(coordinators.values()):
+            coordinator.phase = (phase + index / len(coordinators)) % 1
+
+    async def async_start(self, wait=True):
+        """Start the shared scheduler and run the first refresh."""
+        coordinators = list(self.coordinators.values())
+        for coordinator in coordinators:
+            await coordinator.async_start(schedule=False)
+
+        startup = async_get_startup_scheduler(self.hass)
+        if self._unsub_schedule is None:
+            tick = min((
+                SCHEDULER_TICK,
+                *(interval for coordinator in coordinators for interval in coordinator.endpoint_intervals.values())
+            ))
+            self._unsub_schedule = startup.async_track_phased_interval(
+                self._scheduled_update,
+                timedelta(seconds=tick),
+                self.phase
+            )
+            _LOGGER.info("Scheduled batch updates for %d locations", len(coordinators))
+
+        if wait:
+            await startup.async_initial_refresh(self._scheduled_update)
+        else:
+            self._initial_refresh_task = self.hass.async_create_background_task(
+                startup.async_initial_refresh(
+                    self._scheduled_update,
+                    STARTUP_JITTER if all(coordinator.data for coordinator in coordinators) else 0
+                ),
+                f"{DOMAIN} initial batch refresh"
+            )
+
+    async def _async_refresh_location(self, coordinator):
+        """Refresh one location, bounded by the batch concurrency limit."""
+        async with self._semaphore:
+            await coordinator._scheduled_update()
+
+    async def _scheduled_update(self, _now=None):
+        """Refresh every location that has endpoints due."""
+        await asyncio.gather(*(
+            self._async_refresh_location(coordinator)
+            for coordinator in self.coordinators.values()
+            if coordinator._due_endpoints()
+        ))
+
+    async def async_shutdown(self):
+        """Stop the shared scheduler and all location coordinators."""
+        if self._unsub_schedule:
+            self._unsub_schedule()
+            self._unsub_schedule = None
+        if self._initial_refresh_task is not None:
+            self._initial_refresh_task.cancel()
+            self._initial_refresh_task = None
+        for coordinator in self.coordinators.values():
+            await coordinator.async_shutdown()
+
+@callback
+def async_get_entry_coordinators(hass: HomeAssistant, entry: ConfigEntry):
+    """Return the coordinators of a config entry, keyed by location."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    if isinstance(entry_data, HeWeatherBatchCoordinator):
+        return entry_data.coordinators
+    return {entry_data.location_key: entry_data}
+
+def entry_location_name(entry: ConfigEntry, location):
+    """Return the device name for one location of a config entry."""
+    if len(split_locations(entry.data[CONF_LOCATION])) == 1:
+        return entry.data.get(CONF_NAME) or f"HeWeather {location}"
+    return f"{entry.data.get(CONF_NAME) or 'HeWeather'} {location}"
+
+def _snapshot_ids(entry: ConfigEntry):
+    """Return the snapshot storage id for each location of an entry."""
+    locations = split_locations(entry.data[CONF_LOCATION])
+    if len(locations) == 1:
+        return {locations[0]: entry.entry_id}
+    return {location: f"{entry.entry_id}_{location}" for location in locations}
+
+def _enabled_endpoints(config):
+    """Return the endpoints used by the selected sensors and weather entity, or None for all."""
+    groups = config.get(CONF_ENDPOINTS)
+    sensors = config.get(CONF_SENSORS)
+    if sensors is None:
+        return groups
+    # 只请求所选传感器与天气实体实际读取的接口，且不超出所选接口组
+    used = {
+        SENSOR_TYPES[sensor_type]["data_type"]
+        for sensor_type in sensors
+        if sensor_type in SENSOR_TYPES
+    }
+    if config.get(CONF_WEATHER_ENTITY, DEFAULT_WEATHER_ENTITY):
+        used.update(WEATHER_ENDPOINTS)
+    return [
+        endpoint_name
+        for endpoint_name in (ENDPOINT_GROUPS if groups is None else groups)
+        if endpoint_name in used
+    ]
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up HeWeather from a config entry."""
     config = entry.data
+    # 配置本身无效时重试无意义；网络状况不影响启动
+    if not config.get(CONF_API_KEY) or not split_locations(config.get(CONF_LOCATION, "")):
+        raise ConfigEntryError("HeWeather API key or location is not configured")
     
     # 获取配置的更新间隔（秒），默认为900秒（15分钟）
     update_interval = config.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
-    
-    coordinator = HeWeatherCoordinator(
+    # 分钟级降水需要经纬度（经度在前），使用家庭坐标
+    minutely_location = (
+        f"{hass.config.longitude:.2f},{hass.config.latitude:.2f}"
+        if config.get(CONF_MINUTELY, DEFAULT_MINUTELY) else None
+    )
+    rate_limiter = async_get_rate_limiter(
         hass,
-        config.get(CONF_API_HOST, DEFAULT_API_HOST),
         config[CONF_API_KEY],
-        config[CONF_LOCATION],
-        update_interval
+        config.get(CONF_DAILY_QUOTA, DEFAULT_DAILY_QUOTA)
     )
     
+    # 跟踪模式（仅单一位置）：配置的位置作为解析前的初始位置
+    tracked_entity = config.get(CONF_TRACKED_ENTITY) or None
+    if tracked_entity and len(split_locations(config[CONF_LOCATION])) > 1:
+        _LOGGER.warning("Location tracking is ignored for entries with several locations")
+        tracked_entity = None
+    
+    coordinators = {
+        location: HeWeatherCoordinator(
+            hass,
+            config.get(CONF_API_HOST, DEFAULT_API_HOST),
+            config[CONF_API_KEY],
+            location,
+            update_interval,
+            config.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS),
+            {
+                endpoint_name: config.get(conf_key, DEFAULT_ENDPOINT_INTERVALS[endpoint_name])
+                for endpoint_name, conf_key in CONF_ENDPOINT_INTERVALS.items()
+            },
+            HeWeatherSnapshotStore(hass, storage_id),
+            rate_limiter,
+            config.get(CONF_HOURLY_HOURS, DEFAULT_HOURLY_HOURS),
+            config.get(CONF_ADAPTIVE_INTERVAL, DEFAULT_ADAPTIVE_INTERVAL),
+            minutely_location,
+            bool(tracked_entity and config.get(CONF_GRID_WEATHER)),
+            tracked_entity,
+            _enabled_endpoints(config)
+        )
+        for location, storage_id in _snapshot_ids(entry).items()
+    }
+    
+    # 每个条目有固定的调度相位，使多个条目的请求错开
+    phase = entry_phase(entry.entry_id)
+    
+    # 多个城市时由一个批量协调器统一调度
+    if len(coordinators) == 1:
+        coordinator = next(iter(coordinators.values()))
+        coordinator.phase = phase
+    else:
+        coordinator = HeWeatherBatchCoordinator(hass, coordinators, phase)
+    
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
     
-    # Start the coordinator
-    await coordinator.async_start()
+    # 先载入快照，实体以缓存数据（无快照时为占位状态）立即注册
+    for location_coordinator in coordinators.values():
+        await location_coordinator.async_load_snapshot()
     
     # Set up platforms
     await hass.config_entries.async_forward_entry_setups(entry, ["weather", "sensor"])
     
+    # 首次刷新在后台进行，启动不受网络延迟影响
+    await coordinator.async_start(wait=False)
+    
+    if tracked_entity:
+        geo_host = config.get(CONF_GEO_API_HOST, DEFAULT_GEO_API_HOST)
+        tracker = HeWeatherLocationTracker(
+            hass,
+            coordinator,
+            tracked_entity,
+            geo_host if "://" in geo_host else f"https://{geo_host}"
+        )
+        tracker.async_start()
+        entry.async_on_unload(tracker.async_stop)
+    
     # Register unload callbacks
     entry.async_on_unload(coordinator.async_shutdown)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     
     return True
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """Remove the cached snapshots when a config entry is deleted."""
+    for location, storage_id in _snapshot_ids(entry).items():
+        await HeWeatherSnapshotStore(hass, storage_id).async_remove()
+        ir.async_delete_issue(hass, DOMAIN, f"config_error_{location}")
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, ["weather", "sensor"]):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        domain_data = hass.data[DOMAIN]
+        domain_data.pop(entry.entry_id)
+        # 最后一个条目卸载后关闭共享连接池
+        if not any(
+            isinstance(value, (HeWeatherCoordinator, HeWeatherBatchCoordinator))
+            for value in domain_data.values()
+        ):
+            domain_data.pop(DATA_BROKER, None)
+            domain_data.pop(DATA_BREAKERS, None)
+            domain_data.pop(DATA_STARTUP, None)
+            await async_close_session(hass)
     return unload_ok
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""Learn how often each endpoint publishes new data."""
+from collections import deque
+from datetime import datetime
+import statistics
+
+from .const import (
+    ADAPTIVE_HISTORY,
+    ADAPTIVE_MIN_INTERVAL,
+    ADAPTIVE_PUBLISH_LAG,
+    ADAPTIVE_PHASE_SPREAD
+)
+
+def _timestamp(update_time):
+    """Convert an API updateTime to a POSIX timestamp; None if invalid."""
+    try:
+        return datetime.fromisoformat(update_time).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+class PublishRateTracker:
+    """Track the updateTime values of one endpoint and schedule the next poll.
+
+    The publish period is the median gap between distinct updateTime values.
+    The next poll is placed shortly after the expected next publish time;
+    while the data stays unchanged past that point the delay doubles. The
+    configured interval is always the ceiling. Each coordinator's phase
+    shifts its poll by a slice of the period, since all cities publish at
+    the same clock times.
+    """
+
+    def __init__(self):
+        """Initialize an empty tracker."""
+        self._publish_times = deque(maxlen=ADAPTIVE_HISTORY)
+        self._last_update_time = None
+        self.unchanged_polls = 0
+
+    @property
+    def period(self):
+        """Return the observed publish period in seconds, or None if unknown."""
+        if len(self._publish_times) < 2:
+            return None
+        times = list(self._publish_times)
+        gaps = [later - earlier for earlier, later in zip(times, times[1:]) if later > earlier]
+        return statistics.median(gaps) if gaps else None
+
+    def observe(self, update_time):
+        """Record the updateTime returned by a successful poll."""
+        if update_time == self._last_update_time:
+            self.unchanged_polls += 1
+            return
+        self._last_update_time = update_time
+        self.unchanged_polls = 0
+        timestamp = _timestamp(update_time)
+        if timestamp is not None:
+            self._publish_times.append(timestamp)
+
+    def next_delay(self, ceiling, now, phase=0.0):
+        """Return the seconds until the next poll, never above ``ceiling``."""
+        period = self.period
+        if period is None:
+            return ceiling
+
+        # 在预计发布时间之后稍晚请求，间隔不低于最小值
+        expected = (
+            self._publish_times[-1] + period + ADAPTIVE_PUBLISH_LAG
+            + phase * ADAPTIVE_PHASE_SPREAD * min(period, ceiling)
+        )
+        if expected > now:
+            delay = expected - now
+        else:
+            # 已过预计发布时间仍未更新，按指数退避
+            delay = ADAPTIVE_MIN_INTERVAL * 2 ** self.unchanged_polls
+        return min(ceiling, max(ADAPTIVE_MIN_INTERVAL, delay))
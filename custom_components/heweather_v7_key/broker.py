@@ -0,0 +1,177 @@
+"""Request broker shared by all HeWeather coordinators."""
+import asyncio
+from collections import OrderedDict
+import logging
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import async_timeout
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util.json import json_loads
+
+from .const import (
+    DOMAIN,
+    DATA_BROKER,
+    RESPONSE_CACHE_TTL,
+    BROKER_VALIDATORS_SIZE,
+    REQUEST_TIMEOUT
+)
+from .ratelimit import QuotaExceeded
+from .session import async_get_session
+
+_LOGGER = logging.getLogger(__name__)
+
+@callback
+def async_get_broker(hass: HomeAssistant):
+    """Return the request broker shared by all config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_BROKER not in domain_data:
+        domain_data[DATA_BROKER] = HeWeatherRequestBroker(hass)
+    return domain_data[DATA_BROKER]
+
+class HeWeatherRequestBroker:
+    """Coalesce identical API requests and cache their responses briefly."""
+
+    def __init__(self, hass, cache_ttl=RESPONSE_CACHE_TTL):
+        """Initialize the broker."""
+        self.hass = hass
+        self.cache_ttl = cache_ttl
+        self._inflight = {}
+        self._cache = {}
+        # 按最近使用排序，超过上限时淘汰最久未用的URL
+        self._validators = OrderedDict()
+        self.network_requests = 0
+        self.coalesced_requests = 0
+        self.cache_hits = 0
+
+    @staticmethod
+    def _request_key(url):
+        """Return a canonical key (host, path, sorted query) for a URL."""
+        parts = urlsplit(url)
+        query = urlencode(sorted(parse_qsl(parts.query)))
+        return (parts.netloc, parts.path, query)
+
+    def _prune_cache(self, now):
+        """Drop expired cache entries."""
+        for key in [key for key, (expires, _) in self._cache.items() if expires <= now]:
+            del self._cache[key]
+
+    @staticmethod
+    def _count(stats, name, value=1):
+        """Add to a caller-owned transfer statistics counter."""
+        if stats is not None:
+            stats[name] = stats.get(name, 0) + value
+
+    async def _async_request(self, key, url, timeout, stats, conditional):
+        """Send a conditional request and return the parsed (or unchanged) body."""
+        validator = self._validators.get(key) if conditional else None
+        headers = {}
+        if validator is not None:
+            self._validators.move_to_end(key)
+            if validator["etag"]:
+                headers["If-None-Match"] = validator["etag"]
+            if validator["last_modified"]:
+                headers["If-Modified-Since"] = validator["last_modified"]
+
+        session = async_get_session(self.hass)
+        async with async_timeout.timeout(timeout):
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and validator is not None:
+                    self._count(stats, "not_modified")
+                    self._count(stats, "bytes_saved", validator["size"])
+                    return validator["result"]
+                response.raise_for_status()
+                body = await response.read()
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+
+        self._count(stats, "bytes_downloaded", len(body))
+        digest = hash(body)
+        if validator is not None and validator["digest"] == digest:
+            # 内容完全相同，跳过解析并返回上次的对象
+            self._count(stats, "parses_skipped")
+            return validator["result"]
+
+        parse_start = time.perf_counter()
+        result = json_loads(body)
+        self._count(stats, "json_parse_seconds", time.perf_counter() - parse_start)
+        if result.get("code") != "200" or not conditional:
+            return result
+
+        if (
+            validator is not None
+            and not etag
+            and not last_modified
+            and result.get("updateTime")
+            and result.get("updateTime") == validator["result"].get("updateTime")
+        ):
+            # 无ETag/Last-Modified时以updateTime判断内容未变化
+            self._count(stats, "unchanged_update_time")
+            return validator["result"]
+
+        self._validators[key] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "digest": digest,
+            "size": len(body),
+            "result": result,
+        }
+        self._validators.move_to_end(key)
+        while len(self._validators) > BROKER_VALIDATORS_SIZE:
+            self._validators.popitem(last=False)
+        return result
+
+    async def async_get_json(self, url, rate_limiter=None, timeout=REQUEST_TIMEOUT, stats=None,
+                             conditional=True):
+        """Return the JSON body for a URL, sharing in-flight requests.
+
+        An unchanged response returns the same object as the previous call.
+        With conditional=False no validator is kept for the URL.
+        """
+        key = self._request_key(url)
+        now = time.monotonic()
+
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] > now:
+            self.cache_hits += 1
+            self._count(stats, "cache_hits")
+            return cached[1]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            # 相同请求正在进行，等待其结果；shield防止等待方超时取消共享请求
+            self.coalesced_requests += 1
+            self._count(stats, "coalesced_requests")
+            return await asyncio.shield(future)
+
+        future = self.hass.loop.create_future()
+        self._inflight[key] = future
+        try:
+            # 只有真正发出的请求才消耗配额
+            if rate_limiter is not None and not await rate_limiter.async_acquire():
+                raise QuotaExceeded(
+                    "Daily API quota exhausted or rate limited",
+                    rate_limiter.retry_after()
+                )
+            self.network_requests += 1
+            self._count(stats, "network_requests")
+            result = await self._async_request(key, url, timeout, stats, conditional)
+        except asyncio.CancelledError:
+            # 发起方被取消（通常是超时），等待方按超时处理
+            future.set_exception(asyncio.TimeoutError())
+            future.exception()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+            future.exception()  # 标记异常已读取，避免无人等待时的警告
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        # 仅缓存成功的响应，错误响应由调用方重试
+        if result.get("code") == "200":
+            self._prune_cache(now)
+            self._cache[key] = (time.monotonic() + self.cache_ttl, result)
+        future.set_result(result)
+        return result
@@ -4,15 +4,43 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.const import CONF_NAME
+import homeassistant.helpers.config_validation as cv
 
 from .const import (
     DOMAIN, 
+    split_locations,
     CONF_API_HOST, 
     CONF_API_KEY, 
     CONF_LOCATION,
     CONF_UPDATE_INTERVAL,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_ENDPOINT_INTERVALS,
+    CONF_DAILY_QUOTA,
+    CONF_HOURLY_HOURS,
+    CONF_ADAPTIVE_INTERVAL,
+    CONF_MINUTELY,
+    CONF_TRACKED_ENTITY,
+    CONF_GRID_WEATHER,
+    CONF_GEO_API_HOST,
+    CONF_ENDPOINTS,
+    CONF_SENSORS,
+    CONF_ATTRIBUTE_PROFILE,
+    CONF_WEATHER_ENTITY,
     DEFAULT_API_HOST,
-    DEFAULT_UPDATE_INTERVAL
+    DEFAULT_GEO_API_HOST,
+    DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_ENDPOINT_INTERVALS,
+    DEFAULT_DAILY_QUOTA,
+    DEFAULT_HOURLY_HOURS,
+    DEFAULT_ADAPTIVE_INTERVAL,
+    DEFAULT_MINUTELY,
+    DEFAULT_ATTRIBUTE_PROFILE,
+    DEFAULT_WEATHER_ENTITY,
+    HOURLY_HOURS_OPTIONS,
+    ENDPOINT_GROUPS,
+    SENSOR_TYPES,
+    ATTRIBUTE_PROFILES
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -20,6 +48,11 @@ _LOGGER = logging.getLogger(__name__)
 # 时间范围：5分钟(300秒)到24小时(86400秒)
 MIN_UPDATE_INTERVAL = 300
 MAX_UPDATE_INTERVAL = 86400
+# 并发请求数上限：1（串行）到10
+MIN_CONCURRENT_REQUESTS = 1
+MAX_CONCURRENT_REQUESTS = 10
+# 每日配额下限
+MIN_DAILY_QUOTA = 100
 
 DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_API_HOST, default=DEFAULT_API_HOST): str,
@@ -47,22 +80,33 @@ class HeWeatherConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             
             if not user_input[CONF_API_KEY].strip():
                 errors["base"] = "api_key_required"
-            elif not user_input[CONF_LOCATION].strip():
+            elif not split_locations(user_input[CONF_LOCATION]):
                 errors["base"] = "location_required"
             else:
-                await self.async_set_unique_id(
-                    f"heweather_{user_input[CONF_LOCATION].strip()}"
-                )
+                # 多个位置ID用逗号分隔，由一个条目批量管理
+                location = ",".join(split_locations(user_input[CONF_LOCATION]))
+                await self.async_set_unique_id(f"heweather_{location}")
                 self._abort_if_unique_id_configured()
+                # 每个位置只能属于一个条目，否则实体与设备的唯一ID会冲突
+                configured = {
+                    configured_location
+                    for entry in self._async_current_entries()
+                    for configured_location in split_locations(entry.data.get(CONF_LOCATION, ""))
+                }
+                if configured.intersection(split_locations(location)):
+                    return self.async_abort(reason="already_configured")
                 
-                name = user_input.get(CONF_NAME) or f"HeWeather {user_input[CONF_LOCATION]}"
+                if "," in location:
+                    name = user_input.get(CONF_NAME) or "HeWeather"
+                else:
+                    name = user_input.get(CONF_NAME) or f"HeWeather {location}"
                 
                 return self.async_create_entry(
                     title=name,
                     data={
                         CONF_API_HOST: user_input[CONF_API_HOST],
                         CONF_API_KEY: user_input[CONF_API_KEY],
-                        CONF_LOCATION: user_input[CONF_LOCATION],
+                        CONF_LOCATION: location,
                         CONF_NAME: name,
                         CONF_UPDATE_INTERVAL: user_input[CONF_UPDATE_INTERVAL]
                     },
@@ -74,6 +118,31 @@ class HeWeatherConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def async_step_reauth(self, entry_data):
+        """Start reauthentication after the API rejected the key."""
+        self._reauth_entry = self.hass.config_entries.async_get_entry(self.context["entry_id"])
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input=None):
+        """Ask for a new API key and reload the entry."""
+        errors = {}
+        if user_input is not None:
+            if not user_input[CONF_API_KEY].strip():
+                errors["base"] = "api_key_required"
+            else:
+                self.hass.config_entries.async_update_entry(
+                    self._reauth_entry,
+                    data={**self._reauth_entry.data, CONF_API_KEY: user_input[CONF_API_KEY].strip()}
+                )
+                await self.hass.config_entries.async_reload(self._reauth_entry.entry_id)
+                return self.async_abort(reason="reauth_successful")
+        
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema({vol.Required(CONF_API_KEY): str}),
+            errors=errors,
+        )
+
     @staticmethod
     @callback
     def async_get_options_flow(config_entry):
@@ -98,6 +167,15 @@ class HeWeatherOptionsFlow(config_entries.OptionsFlow):
             )
             return self.async_create_entry(title="", data={})
         
+        # 各接口独立的更新间隔
+        interval_schema = {
+            vol.Optional(
+                conf_key,
+                default=self.config_entry.data.get(conf_key, DEFAULT_ENDPOINT_INTERVALS[endpoint_name])
+            ): vol.All(vol.Coerce(int), vol.Range(min=MIN_UPDATE_INTERVAL, max=MAX_UPDATE_INTERVAL))
+            for endpoint_name, conf_key in CONF_ENDPOINT_INTERVALS.items()
+        }
+        
         # 显示当前配置值的表单
         return self.async_show_form(
             step_id="init",
@@ -121,6 +199,60 @@ class HeWeatherOptionsFlow(config_entries.OptionsFlow):
                 vol.Required(
                     CONF_UPDATE_INTERVAL,
                     default=self.config_entry.data.get(CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL)
-                ): vol.All(vol.Coerce(int), vol.Range(min=MIN_UPDATE_INTERVAL, max=MAX_UPDATE_INTERVAL))
+                ): vol.All(vol.Coerce(int), vol.Range(min=MIN_UPDATE_INTERVAL, max=MAX_UPDATE_INTERVAL)),
+                vol.Optional(
+                    CONF_MAX_CONCURRENT_REQUESTS,
+                    default=self.config_entry.data.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS)
+                ): vol.All(vol.Coerce(int), vol.Range(min=MIN_CONCURRENT_REQUESTS, max=MAX_CONCURRENT_REQUESTS)),
+                vol.Optional(
+                    CONF_DAILY_QUOTA,
+                    default=self.config_entry.data.get(CONF_DAILY_QUOTA, DEFAULT_DAILY_QUOTA)
+                ): vol.All(vol.Coerce(int), vol.Range(min=MIN_DAILY_QUOTA)),
+                vol.Optional(
+                    CONF_HOURLY_HOURS,
+                    default=self.config_entry.data.get(CONF_HOURLY_HOURS, DEFAULT_HOURLY_HOURS)
+                ): vol.All(vol.Coerce(int), vol.In(HOURLY_HOURS_OPTIONS)),
+                vol.Optional(
+                    CONF_ADAPTIVE_INTERVAL,
+                    default=self.config_entry.data.get(CONF_ADAPTIVE_INTERVAL, DEFAULT_ADAPTIVE_INTERVAL)
+                ): bool,
+                vol.Optional(
+                    CONF_MINUTELY,
+                    default=self.config_entry.data.get(CONF_MINUTELY, DEFAULT_MINUTELY)
+                ): bool,
+                # 跟踪模式：填写 zone./person./device_tracker. 实体ID，留空关闭
+                vol.Optional(
+                    CONF_TRACKED_ENTITY,
+                    default=self.config_entry.data.get(CONF_TRACKED_ENTITY, "")
+                ): str,
+                vol.Optional(
+                    CONF_GRID_WEATHER,
+                    default=self.config_entry.data.get(CONF_GRID_WEATHER, False)
+                ): bool,
+                vol.Optional(
+                    CONF_GEO_API_HOST,
+                    default=self.config_entry.data.get(CONF_GEO_API_HOST, DEFAULT_GEO_API_HOST)
+                ): str,
+                # 接口组与传感器选择：未选择的接口不请求，未选择的传感器不创建
+                vol.Optional(
+                    CONF_ENDPOINTS,
+                    default=self.config_entry.data.get(CONF_ENDPOINTS, list(ENDPOINT_GROUPS))
+                ): vol.All(cv.multi_select(ENDPOINT_GROUPS), vol.Length(min=1)),
+                vol.Optional(
+                    CONF_WEATHER_ENTITY,
+                    default=self.config_entry.data.get(CONF_WEATHER_ENTITY, DEFAULT_WEATHER_ENTITY)
+                ): bool,
+                vol.Optional(
+                    CONF_SENSORS,
+                    default=self.config_entry.data.get(CONF_SENSORS, list(SENSOR_TYPES))
+                ): cv.multi_select({
+                    sensor_type: sensor_config["name"]
+                    for sensor_type, sensor_config in SENSOR_TYPES.items()
+                }),
+                vol.Optional(
+                    CONF_ATTRIBUTE_PROFILE,
+                    default=self.config_entry.data.get(CONF_ATTRIBUTE_PROFILE, DEFAULT_ATTRIBUTE_PROFILE)
+                ): vol.In(ATTRIBUTE_PROFILES),
+                **interval_schema
             })
         )
\ No newline at end of file
@@ -6,106 +6,309 @@ CONF_API_KEY = "api_key"
 CONF_LOCATION = "location"
 CONF_NAME = "name"
 CONF_UPDATE_INTERVAL = "update_interval"
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
 
 DEFAULT_API_HOST = "devapi.qweather.com"
 DEFAULT_UPDATE_INTERVAL = 900  # 15分钟 = 900秒
+DEFAULT_MAX_CONCURRENT_REQUESTS = 5  # 同时进行的接口请求数上限
+
+# 全集成共享的HTTP连接池
+DATA_SESSION = "session"
+CONNECTION_LIMIT_PER_HOST = 6
+DNS_CACHE_TTL = 300  # 秒
+KEEPALIVE_TIMEOUT = 60  # 秒
+
+# 跨条目的请求合并与短期响应缓存
+DATA_BROKER = "broker"
+RESPONSE_CACHE_TTL = 30  # 秒
+BROKER_VALIDATORS_SIZE = 2048  # 条件请求校验信息（含上次结果）最多保留的URL数
+
+# 每日配额与限流（按API Key共享）
+CONF_DAILY_QUOTA = "daily_quota"
+DEFAULT_DAILY_QUOTA = 1000  # 免费开发版每日调用次数
+DATA_RATE_LIMITERS = "rate_limiters"
+RATE_LIMIT_BURST = 30  # 令牌桶容量，允许启动时的突发请求
+RATE_LIMIT_MAX_WAIT = 10  # 等待令牌的最长时间（秒）
+RATE_LIMIT_PLAN_INTERVAL = 300  # 重新规划配额的间隔（秒）
+QUOTA_SAFETY_MARGIN = 0.9  # 规划时只使用90%的配额
+MAX_INTERVAL_STRETCH = 4  # 低优先级接口间隔最多拉长的倍数
+
+# 接口优先级（数字越大越先被拉长或暂停）
+ENDPOINT_PRIORITY = {
+    "warning": 0,
+    "current": 1,
+    "minutely": 1,
+    "air": 2,
+    "forecast": 3,
+    "hourly": 3,
+    "indices": 4
+}
+DROPPABLE_ENDPOINTS = ("indices",)
+
+REQUEST_TIMEOUT = 15  # 单次请求超时（秒）
+
+# 认证或配置错误（401认证失败、403无权限、400请求错误、404位置不存在），重试无意义
+CONFIG_ERROR_CODES = ("400", "401", "403", "404")
+# 只与本位置或本账号有关的结果（204该位置无数据、402超过访问次数或余额不足），不重试也不计入熔断
+NON_RETRYABLE_CODES = ("204", "402")
+# 认证失败（401）或无权限（403）时启动重新认证流程
+AUTH_ERROR_CODES = ("401", "403")
+
+# 请求延迟直方图的桶上界（秒）
+METRICS_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# 重试退避与熔断
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1  # 秒
+RETRY_MAX_DELAY = 10  # 秒
+DATA_BREAKERS = "breakers"
+BREAKER_ENDPOINT_THRESHOLD = 3  # 接口连续失败次数
+BREAKER_HOST_THRESHOLD = 6  # 主机连续网络失败次数
+BREAKER_COOLDOWN = 300  # 熔断冷却时间（秒）
+
+# 磁盘快照：重启后先用上次数据建立实体
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60  # 写入防抖（秒）
 
 API_ENDPOINTS = {
     "current": "/v7/weather/now",
     "forecast": "/v7/weather/7d",
     "warning": "/v7/warning/now",
     "air": "/v7/air/now",
-    "indices": "/v7/indices/1d"
+    "indices": "/v7/indices/1d",
+    "hourly": "/v7/weather/24h",
+    "minutely": "/v7/minutely/5m"
+}
+
+# 选项中可选择的接口组与传感器；未配置时全部启用
+CONF_ENDPOINTS = "endpoints"
+CONF_SENSORS = "sensors"
+ENDPOINT_GROUPS = {
+    "current": "实时天气",
+    "forecast": "每日预报",
+    "hourly": "逐小时预报",
+    "warning": "天气预警",
+    "air": "空气质量",
+    "indices": "生活指数",
+}
+# 天气实体读取的接口；关闭天气实体后只请求所选传感器用到的接口
+CONF_WEATHER_ENTITY = "weather_entity"
+DEFAULT_WEATHER_ENTITY = True
+WEATHER_ENDPOINTS = ("current", "forecast", "hourly")
+
+# 跟踪模式：按区域/人员/设备追踪器的坐标解析位置
+CONF_TRACKED_ENTITY = "tracked_entity"
+CONF_GRID_WEATHER = "grid_weather"
+CONF_GEO_API_HOST = "geo_api_host"
+DEFAULT_GEO_API_HOST = "geoapi.qweather.com"
+GEO_LOOKUP_PATH = "/v2/city/lookup"
+DATA_GEO_CACHE = "geo_cache"
+GEO_CELL_PRECISION = 5  # geohash精度，5位约4.9km×4.9km
+GEO_CACHE_SIZE = 512
+GEO_CACHE_TTL = 7 * 86400  # 秒
+# 格点天气接口（按经纬度），启用后替换对应的城市接口
+GRID_ENDPOINTS = {
+    "current": "/v7/grid-weather/now",
+    "forecast": "/v7/grid-weather/7d",
+    "hourly": "/v7/grid-weather/24h",
+}
+
+# 分钟级降水只支持经纬度，启用后使用 Home Assistant 的家庭坐标
+CONF_MINUTELY = "minutely"
+DEFAULT_MINUTELY = False
+MINUTELY_SLOTS = 24  # 2小时，每5分钟一个时段
+MINUTELY_SLOT_SECONDS = 300
+RAIN_THRESHOLD = 0.01  # 毫米，达到即视为有降水
+EVENT_RAIN_START = "heweather_rain_start"
+EVENT_RAIN_END = "heweather_rain_end"
+
+# 预警变化事件与动态预警实体的调度信号
+EVENT_WARNING = "heweather_warning"
+SIGNAL_WARNING_ADDED = "heweather_warning_added_{}"
+SIGNAL_WARNING_CHANGED = "heweather_warning_changed_{}_{}"
+
+# 逐小时预报时长（小时）；72h/168h需要对应的订阅
+CONF_HOURLY_HOURS = "hourly_hours"
+DEFAULT_HOURLY_HOURS = 24
+HOURLY_HOURS_OPTIONS = [24, 72, 168]
+
+# 各接口独立的更新间隔（秒）；实时天气沿用全局更新间隔
+CONF_ENDPOINT_INTERVALS = {
+    "forecast": "forecast_interval",
+    "warning": "warning_interval",
+    "air": "air_interval",
+    "indices": "indices_interval",
+    "hourly": "hourly_interval",
+    "minutely": "minutely_interval"
+}
+
+DEFAULT_ENDPOINT_INTERVALS = {
+    "forecast": 10800,  # 3小时
+    "warning": 300,  # 5分钟
+    "air": 1800,  # 30分钟
+    "indices": 21600,  # 6小时
+    "hourly": 3600,  # 1小时
+    "minutely": 300  # 5分钟
 }
 
+SCHEDULER_TICK = 60  # 调度器检查到期接口的间隔（秒）
+
+# 自适应刷新：根据 updateTime 的实际变化频率安排请求，配置的间隔为上限
+CONF_ADAPTIVE_INTERVAL = "adaptive_interval"
+DEFAULT_ADAPTIVE_INTERVAL = True
+ADAPTIVE_HISTORY = 8  # 记录最近几次发布时间
+ADAPTIVE_MIN_INTERVAL = 120  # 自适应间隔下限（秒）
+ADAPTIVE_PUBLISH_LAG = 60  # 预计发布时间之后再等待的秒数
+ADAPTIVE_PHASE_SPREAD = 0.25  # 各协调器按相位错开的请求时间，占发布周期的比例
+BATCH_MAX_CONCURRENT_REFRESHES = 4  # 批量模式下同时刷新的城市数
+
+# 历史数据环形缓冲：每个字段最多保留的样本数与时间窗口（秒）
+HISTORY_CAPACITY = 288
+HISTORY_WINDOW = 86400
+# 记录历史的接口：(观测时间属性, 数值字段)
+HISTORY_FIELDS = {
+    "current": ("obs_time", ("temp", "feels_like", "humidity", "precip", "pressure", "vis", "cloud", "dew", "wind_speed")),
+    "air": ("pub_time", ("aqi", "pm10", "pm2p5", "no2", "so2", "co", "o3")),
+}
+PRESSURE_TREND_THRESHOLD = 1.0  # 3小时气压变化超过该值（hPa）视为上升/下降
+
+# 启动错峰：所有条目共享的首次刷新并发上限与随机延迟
+DATA_STARTUP = "startup"
+STARTUP_MAX_CONCURRENT_REFRESHES = 3
+STARTUP_JITTER = 30  # 已有快照时首次刷新的最大随机延迟（秒）
+
 ATTR_LAST_UPDATE = "last_update"
 ATTR_SOURCE = "data_source"
+ATTR_STALE = "stale"
 
+# 属性档位：minimal 仅保留过期标记；standard 去掉数据来源、更新时间和长文本；
+# full 为全部属性
+CONF_ATTRIBUTE_PROFILE = "attribute_profile"
+ATTRIBUTE_PROFILE_MINIMAL = "minimal"
+ATTRIBUTE_PROFILE_STANDARD = "standard"
+ATTRIBUTE_PROFILE_FULL = "full"
+ATTRIBUTE_PROFILES = [ATTRIBUTE_PROFILE_MINIMAL, ATTRIBUTE_PROFILE_STANDARD, ATTRIBUTE_PROFILE_FULL]
+DEFAULT_ATTRIBUTE_PROFILE = ATTRIBUTE_PROFILE_STANDARD
+SHARED_ATTRIBUTES_SIZE = 1024  # 共享属性字典的缓存上限
+
+# 传感器取值方式（启动时编译为访问函数）：
+#   path/default: 按属性路径从解析后的接口记录取值，整数表示下标
+#   index_type: 生活指数类型，从按类型建立的索引中取category
+#   aggregate: 预警汇总（count数量 / status开关）
+#   constant: 固定值
 SENSOR_TYPES = {
     #now接口
     "temperature": {
         "name": "气温",
         "unit": "°C",
         "icon": "mdi:thermometer",
-        "data_type": "current"
+        "data_type": "current",
+        "path": ("temp",),
+        "default": 0
    },
     "wind_direction": {
         "name": "风向",
         "unit": None,
         "icon": "mdi:weather-windy-variant",
-        "data_type": "current"
+        "data_type": "current",
+        "path": ("wind_dir",),
+        "default": "N/A"
    },
     "feels_like": {
         "name": "体感温度",
         "unit": "°C",
         "icon": "mdi:thermometer",
-        "data_type": "current"
+        "data_type": "current",
+        "path": ("feels_like",),
+        "default": 0
     },
     "humidity": {
         "name": "湿度",
         "unit": "%",
         "icon": "mdi:water-percent",
-        "data_type": "current"
+        "data_type": "current",
+        "path": ("humidity",),
+        "default": 0
     },
     "wind_scale": {
         "name": "风力等级",
         "unit": "级",
         "icon": "mdi:wind-power",
-        "data_type": "current"
+        "data_type": "current",
+        "path": ("wind_scale",),
+        "default": 0
     },
     "wind_speed": {
         "name": "风速",
         "unit": "km/h",
         "icon": "mdi:weather-windy",
-        "data_type": "current"
+        "data_type": "current",
+        "path": ("wind_speed",),
+        "default": 0
     },
     "precip": {
         "name": "过去1小时降水量",
         "unit": "mm",
         "icon": "mdi:weather-rainy",
-        "data_type": "current"
+        "data_type": "current",
+        "path": ("precip",),
+        "default": 0.0
     },
     "pressure": {
         "name": "大气压强",
         "unit": "hPa",
         "icon": "mdi:gauge",
-        "data_type": "current"
+        "data_type": "current",
+        "path": ("pressure",),
+        "default": 0
     },
     "vis": {
         "name": "能见度",
         "unit": "km",
         "icon": "mdi:eye",
-        "data_type": "current"
+        "data_type": "current",
+        "path": ("vis",),
+        "default": 0
     },
     "cloud": {
         "name": "云量",
         "unit": "%",
         "icon": "mdi:weather-cloudy",
-        "data_type": "current"
+        "data_type": "current",
+        "path": ("cloud",),
+        "default": 0
     },
     "dew": {
         "name": "露点温度",
         "unit": "°C",
         "icon": "mdi:thermometer-water",
-        "data_type": "current"
+        "data_type": "current",
+        "path": ("dew",),
+        "default": 0
     },
     "weather_today": {
         "name": "今天天气",
         "unit": None,
         "icon": "mdi:weather-sunny-alert",
-        "data_type": "forecast"
+        "data_type": "forecast",
+        "path": ("days", 0, "text_day"),
+        "default": "N/A"
     },
     "weather_tomorrow": {
         "name": "明天天气",
         "unit": None,
         "icon": "mdi:weather-sunny-alert",
-        "data_type": "forecast"
+        "data_type": "forecast",
+        "path": ("days", 1, "text_day"),
+        "default": "N/A"
     },
     "weather_day_after": {
         "name": "后天天气",
         "unit": None,
         "icon": "mdi:weather-cloudy-clock",
-        "data_type": "forecast"
+        "data_type": "forecast",
+        "path": ("days", 2, "text_day"),
+        "default": "N/A"
     },
 
     #warning接口
@@ -113,13 +316,15 @@ SENSOR_TYPES = {
         "name": "天气预警",
         "unit": None,
         "icon": "mdi:alert-circle-outline",
-        "data_type":"warning"
+        "data_type":"warning",
+        "aggregate": "status"
     },
     "warning_count": {
         "name": "预警数量",
         "unit": None,
         "icon": "mdi:alert",
-        "data_type": "warning"
+        "data_type": "warning",
+        "aggregate": "count"
     },
 
     #air
@@ -128,163 +333,325 @@ SENSOR_TYPES = {
         "name": "空气质量指数",
         "unit": "",
         "icon": "mdi:air-filter",
-        "data_type": "air"
+        "data_type": "air",
+        "path": ("aqi",),
+        "default": 0
     },
     "pm25": {
         "name": "PM2.5",
         "unit": "μg/m³",
         "icon": "mdi:air-filter",
-        "data_type": "air"
+        "data_type": "air",
+        "path": ("pm2p5",),
+        "default": 0
     },
     "pm10": {
         "name": "PM10",
         "unit": "μg/m³",
         "icon": "mdi:air-filter",
-        "data_type": "air"
+        "data_type": "air",
+        "path": ("pm10",),
+        "default": 0
     },
     "primary_pollutant": {
         "name": "主要污染物",
         "unit": None,
         "icon": "mdi:alert-circle",
-        "data_type": "air"
+        "data_type": "air",
+        "path": ("primary",),
+        "default": "NA"
     },
     "air_quality_level": {
         "name": "空气质量等级",
         "unit": None,
         "icon": "mdi:numeric-1-circle",
-        "data_type": "air"
+        "data_type": "air",
+        "path": ("level",),
+        "default": 0
     },
     "air_quality_category": {
         "name": "空气质量类别",
         "unit": None,
         "icon": "mdi:emoticon-happy-outline",
-        "data_type": "air"
+        "data_type": "air",
+        "path": ("category",),
+        "default": "未知"
     },
     "no2": {
         "name": "二氧化氮",
         "unit": "μg/m³",
         "icon": "mdi:chemical-weapon",
-        "data_type": "air"
+        "data_type": "air",
+        "path": ("no2",),
+        "default": "NA"
     },
     "so2": {
         "name": "二氧化硫",
         "unit": "μg/m³",
         "icon": "mdi:cloud-outline",
-        "data_type": "air"
+        "data_type": "air",
+        "path": ("so2",),
+        "default": "NA"
     },
     "co": {
         "name": "一氧化碳",
         "unit": "mg/m³",
         "icon": "mdi:molecule-co",
-        "data_type": "air"
+        "data_type": "air",
+        "path": ("co",),
+        "default": "NA"
     },
     "o3": {
         "name": "臭氧",
         "unit": "μg/m³",
         "icon": "mdi:weather-sunny-alert",
-        "data_type": "air"
+        "data_type": "air",
+        "path": ("o3",),
+        "default": "NA"
     },
     #生活指数
     "sport_index": {
         "name": "运动指数",
         "unit": None,
         "icon": "mdi:run",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "1"
     },
     "car_washing_index": {
         "name": "洗车指数",
         "unit": None,
         "icon": "mdi:car-wash",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "2"
     },
     "dressing_index": {
         "name": "穿衣指数",
         "unit": None,
         "icon": "mdi:tshirt-crew",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "3"
     },
     "fishing_index": {
         "name": "钓鱼指数",
         "unit": None,
         "icon": "mdi:fish",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "4"
     },
     "uv_index": {
         "name": "紫外线指数",
         "unit": None,
         "icon": "mdi:weather-sunny-alert",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "5"
     },
     "tourism_index": {
         "name": "旅游指数",
         "unit": None,
         "icon": "mdi:map-marker-radius",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "6"
     },
     "allergy_index": {
         "name": "过敏指数",
         "unit": None,
         "icon": "mdi:emoticon-sick",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "7"
     },
     "comfort_index": {
         "name": "舒适度指数",
         "unit": None,
         "icon": "mdi:emoticon-happy-outline",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "8"
     },
     "cold_index": {
         "name": "感冒指数",
         "unit": None,
         "icon": "mdi:face-mask",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "9"
     },
     "air_dispersion_index": {
         "name": "空气污染扩散条件指数",
         "unit": None,
         "icon": "mdi:weather-windy",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "10"
     },
     "aircon_index": {
         "name": "空调开启指数",
         "unit": None,
         "icon": "mdi:air-conditioner",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "11"
     },
     "sunglass_index": {
         "name": "太阳镜指数",
         "unit": None,
         "icon": "mdi:sunglasses",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "12"
     },
     "makeup_index": {
         "name": "化妆指数",
         "unit": None,
         "icon": "mdi:lipstick",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "13"
     },
     "drying_index": {
         "name": "晾晒指数",
         "unit": None,
         "icon": "mdi:tumble-dryer",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "14"
     },
     "traffic_index": {
         "name": "交通指数",
         "unit": None,
         "icon": "mdi:car",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "15"
     },
     "sunscreen_index": {
         "name": "防晒指数",
         "unit": None,
         "icon": "mdi:weather-sunny-off",
-        "data_type": "indices"
+        "data_type": "indices",
+        "index_type": "16"
     },
     "info": {
         "name": "接口信息",
         "unit": None,
         "icon": "mdi:information-outline",
-        "data_type": "meta"
+        "data_type": "meta",
+        "constant": "正常"
+    },
+    # 分钟级降水
+    "rain_start": {
+        "name": "降雨开始",
+        "unit": "min",
+        "icon": "mdi:weather-pouring",
+        "data_type": "minutely",
+        "nowcast": "minutes_until_rain"
+    },
+    "rain_end": {
+        "name": "降雨结束",
+        "unit": None,
+        "icon": "mdi:weather-partly-rainy",
+        "data_type": "minutely",
+        "nowcast": "rain_end_datetime",
+        "device_class": "timestamp"
+    },
+    "minutely_summary": {
+        "name": "降水预报",
+        "unit": None,
+        "icon": "mdi:umbrella-outline",
+        "data_type": "minutely",
+        "path": ("summary",),
+        "default": ""
+    },
+    # 派生传感器：由历史数据计算
+    "pressure_trend": {
+        "name": "气压趋势",
+        "unit": None,
+        "icon": "mdi:gauge",
+        "data_type": "current",
+        "history": ("current", "pressure"),
+        "statistic": "trend"
+    },
+    "temperature_delta_3h": {
+        "name": "3小时气温变化",
+        "unit": "°C",
+        "icon": "mdi:thermometer-lines",
+        "data_type": "current",
+        "history": ("current", "temp"),
+        "statistic": "delta_3h",
+        "state_class": "measurement"
+    },
+    "aqi_mean_24h": {
+        "name": "24小时平均空气质量",
+        "unit": None,
+        "icon": "mdi:chart-line",
+        "data_type": "air",
+        "history": ("air", "aqi"),
+        "statistic": "mean",
+        "state_class": "measurement"
+    },
+    # 诊断传感器：协调器运行指标
+    "api_latency_p95": {
+        "name": "接口延迟P95",
+        "unit": "ms",
+        "icon": "mdi:timer-outline",
+        "data_type": "meta",
+        "metric": "latency_p95",
+        "entity_category": "diagnostic",
+        "state_class": "measurement"
+    },
+    "api_retries": {
+        "name": "接口重试次数",
+        "unit": None,
+        "icon": "mdi:repeat",
+        "data_type": "meta",
+        "metric": "retries",
+        "entity_category": "diagnostic",
+        "state_class": "total_increasing"
+    },
+    "bytes_downloaded": {
+        "name": "下载数据量",
+        "unit": "B",
+        "icon": "mdi:download-network-outline",
+        "data_type": "meta",
+        "metric": "bytes_downloaded",
+        "entity_category": "diagnostic",
+        "state_class": "total_increasing"
+    },
+    "parse_time": {
+        "name": "解析耗时",
+        "unit": "ms",
+        "icon": "mdi:code-json",
+        "data_type": "meta",
+        "metric": "parse_ms",
+        "entity_category": "diagnostic",
+        "state_class": "total_increasing"
+    },
+    "fanout_time": {
+        "name": "通知耗时",
+        "unit": "ms",
+        "icon": "mdi:broadcast",
+        "data_type": "meta",
+        "metric": "fanout_ms",
+        "entity_category": "diagnostic",
+        "state_class": "total_increasing"
+    },
+    "cache_hit_rate": {
+        "name": "缓存命中率",
+        "unit": "%",
+        "icon": "mdi:cached",
+        "data_type": "meta",
+        "metric": "cache_hit_rate",
+        "entity_category": "diagnostic",
+        "state_class": "measurement"
+    },
+    "quota_remaining": {
+        "name": "剩余配额",
+        "unit": None,
+        "icon": "mdi:gauge",
+        "data_type": "meta",
+        "metric": "quota_remaining",
+        "entity_category": "diagnostic",
+        "state_class": "measurement"
     }
-}
\ No newline at end of file
+}
+
+# 配置流程与集成共用，不依赖集成的其他模块
+def split_locations(value):
+    """Split a comma-separated location setting into unique location IDs."""
+    locations = []
+    for location in str(value).replace("，", ",").split(","):
+        location = location.strip()
+        if location and location not in locations:
+            locations.append(location)
+    return locations
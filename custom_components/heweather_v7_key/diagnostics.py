@@ -0,0 +1,56 @@
+"""Diagnostics support for HeWeather."""
+from homeassistant.components.diagnostics import REDACTED, async_redact_data
+
+from . import async_get_entry_coordinators
+from .broker import async_get_broker
+from .const import CONF_API_KEY, CONF_TRACKED_ENTITY
+from .geo import async_get_geo_cache
+from .retry import async_get_breakers
+
+# 跟踪模式下的实体ID与格网坐标会暴露被跟踪人员的位置
+TO_REDACT = {CONF_API_KEY, CONF_TRACKED_ENTITY, "grid_location"}
+
+async def async_get_config_entry_diagnostics(hass, entry):
+    """Return diagnostics for a config entry, including coordinator metrics."""
+    broker = async_get_broker(hass)
+    breakers = async_get_breakers(hass)
+    locations = {}
+    tracked_entity = entry.data.get(CONF_TRACKED_ENTITY)
+    for location, coordinator in async_get_entry_coordinators(hass, entry).items():
+        # 跟踪模式下以被跟踪实体ID为键，当前位置由其坐标解析而来，同样需要脱敏
+        tracking = bool(tracked_entity) and location == tracked_entity
+        if tracking:
+            location = REDACTED
+        locations[location] = {
+            "location": REDACTED if tracking else coordinator.location,
+            "grid_location": coordinator.grid_location,
+            "last_update": coordinator.data.get("last_update", ""),
+            "stale": bool(coordinator.data.get("stale")),
+            "endpoint_intervals": coordinator.endpoint_intervals,
+            "endpoint_durations": coordinator.data.get("endpoint_durations", {}),
+            "transfer_stats": coordinator.transfer_stats,
+            "circuit_breakers": breakers.states(
+                coordinator.api_host,
+                coordinator.endpoint_paths.values()
+            ),
+            "metrics": coordinator.metrics.snapshot(
+                coordinator.transfer_stats,
+                coordinator.rate_limiter
+            ),
+            "prometheus": coordinator.metrics.prometheus(
+                {"location": location},
+                coordinator.transfer_stats,
+                coordinator.rate_limiter
+            ),
+        }
+
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "broker": {
+            "network_requests": broker.network_requests,
+            "coalesced_requests": broker.coalesced_requests,
+            "cache_hits": broker.cache_hits,
+        },
+        "geo_cache": async_get_geo_cache(hass).stats(),
+        "locations": async_redact_data(locations, TO_REDACT),
+    }
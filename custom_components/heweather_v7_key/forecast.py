@@ -0,0 +1,57 @@
+"""Time-indexed ring buffer for the hourly forecast."""
+import time
+
+class HourlyForecastStore:
+    """Fixed-size ring buffer of hourly forecast records indexed by hour.
+
+    Each record lands in slot ``epoch_hour % capacity``, so a new fetch
+    overwrites the same hours in place and past hours fall out of the
+    window returned by :meth:`upcoming`.
+    """
+
+    def __init__(self, capacity):
+        """Initialize an empty store for ``capacity`` hours."""
+        self.capacity = capacity
+        self._hours = [None] * capacity
+        self._records = [None] * capacity
+        self.version = 0
+
+    @staticmethod
+    def current_hour():
+        """Return the current hour since the epoch."""
+        return int(time.time()) // 3600
+
+    def merge(self, records):
+        """Merge new records in place and drop past hours; return True if changed."""
+        now_hour = self.current_hour()
+        changed = False
+        for slot, hour in enumerate(self._hours):
+            if hour is not None and hour < now_hour:
+                self._hours[slot] = None
+                self._records[slot] = None
+                changed = True
+
+        for record in records:
+            hour = record.epoch_hour
+            if hour < now_hour or hour >= now_hour + self.capacity:
+                continue
+            slot = hour % self.capacity
+            if self._hours[slot] != hour or self._records[slot] != record:
+                self._hours[slot] = hour
+                self._records[slot] = record
+                changed = True
+
+        if changed:
+            self.version += 1
+        return changed
+
+    def upcoming(self, now_hour=None):
+        """Return the stored records from the current hour onward, in order."""
+        if now_hour is None:
+            now_hour = self.current_hour()
+        capacity = self.capacity
+        return [
+            self._records[hour % capacity]
+            for hour in range(now_hour, now_hour + capacity)
+            if self._hours[hour % capacity] == hour
+        ]
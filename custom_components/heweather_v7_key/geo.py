@@ -0,0 +1,221 @@
+"""Resolve tracked coordinates to QWeather locations through a geohash cache."""
+from collections import OrderedDict
+import logging
+import time
+
+from homeassistant.const import ATTR_LATITUDE, ATTR_LONGITUDE
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .broker import async_get_broker
+from .const import (
+    DOMAIN,
+    DATA_GEO_CACHE,
+    GEO_CACHE_SIZE,
+    GEO_CACHE_TTL,
+    GEO_CELL_PRECISION,
+    GEO_LOOKUP_PATH
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+def geohash_encode(latitude, longitude, precision=GEO_CELL_PRECISION):
+    """Return the geohash of a coordinate."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, value_range = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            value_range[0] = middle
+        else:
+            value_range[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+def geohash_center(geohash):
+    """Return the (latitude, longitude) center of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        bits = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            value_range = lon_range if even else lat_range
+            middle = (value_range[0] + value_range[1]) / 2
+            if bits >> shift & 1:
+                value_range[0] = middle
+            else:
+                value_range[1] = middle
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+def cell_coordinates(geohash):
+    """Return the "longitude,latitude" query value for a cell center."""
+    latitude, longitude = geohash_center(geohash)
+    return f"{longitude:.2f},{latitude:.2f}"
+
+@callback
+def async_get_geo_cache(hass: HomeAssistant):
+    """Return the geohash lookup cache shared by all config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_GEO_CACHE not in domain_data:
+        domain_data[DATA_GEO_CACHE] = HeWeatherGeoCache(hass)
+    return domain_data[DATA_GEO_CACHE]
+
+class HeWeatherGeoCache:
+    """LRU cache of GeoAPI city lookups keyed by geohash cell, with a TTL."""
+
+    def __init__(self, hass, max_size=GEO_CACHE_SIZE, ttl=GEO_CACHE_TTL):
+        """Initialize the cache."""
+        self.hass = hass
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.lookups = 0
+        self.evictions = 0
+
+    def get(self, cell):
+        """Return the cached location ID for a cell, or None."""
+        entry = self._entries.get(cell)
+        if entry is None:
+            return None
+        location, expires = entry
+        if expires <= time.monotonic():
+            del self._entries[cell]
+            return None
+        self._entries.move_to_end(cell)
+        return location
+
+    def put(self, cell, location):
+        """Store a lookup result, evicting the least recently used cells."""
+        self._entries[cell] = (location, time.monotonic() + self.ttl)
+        self._entries.move_to_end(cell)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def async_resolve(self, cell, geo_base, api_key, rate_limiter=None):
+        """Return the QWeather location ID for a cell, looking it up on a miss."""
+        location = self.get(cell)
+        if location is not None:
+            self.hits += 1
+            return location
+
+        self.lookups += 1
+        url = f"{geo_base}{GEO_LOOKUP_PATH}?location={cell_coordinates(cell)}&key={api_key}&number=1"
+        # 查询结果由本缓存保存，不在请求代理中保留条件请求校验信息
+        result = await async_get_broker(self.hass).async_get_json(url, rate_limiter, conditional=False)
+        if result.get("code") != "200" or not result.get("location"):
+            _LOGGER.warning("GeoAPI lookup for cell %s failed: code %s", cell, result.get("code"))
+            return None
+        location = result["location"][0].get("id")
+        if location:
+            self.put(cell, location)
+        return location
+
+    def stats(self):
+        """Return the cache counters."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "lookups": self.lookups,
+            "evictions": self.evictions,
+        }
+
+class HeWeatherLocationTracker:
+    """Follow a zone, person or device tracker and move a coordinator with it.
+
+    Only a change of geohash cell triggers a lookup (served from the cache
+    when possible) and a refresh; GPS jitter within a cell is ignored.
+    """
+
+    def __init__(self, hass, coordinator, entity_id, geo_base):
+        """Initialize the tracker."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.entity_id = entity_id
+        self.geo_base = geo_base
+        self.cell = None
+        self._unsub = None
+        # 正在进行的解析任务，位置再次变化或停止跟踪时取消
+        self._task = None
+
+    @callback
+    def async_start(self):
+        """Subscribe to the tracked entity and resolve its current position."""
+        self._unsub = async_track_state_change_event(
+            self.hass, [self.entity_id], self._async_state_changed
+        )
+        self._async_update_position(self.hass.states.get(self.entity_id))
+
+    @callback
+    def async_stop(self):
+        """Stop following the entity."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @callback
+    def _async_state_changed(self, event):
+        """Handle a state change of the tracked entity."""
+        self._async_update_position(event.data.get("new_state"))
+
+    @callback
+    def _async_update_position(self, state):
+        """Resolve the new position if it moved to another cell."""
+        if state is None:
+            return
+        latitude = state.attributes.get(ATTR_LATITUDE)
+        longitude = state.attributes.get(ATTR_LONGITUDE)
+        if latitude is None or longitude is None:
+            return
+        cell = geohash_encode(latitude, longitude)
+        if cell == self.cell:
+            return
+        self.cell = cell
+        if self._task is not None:
+            self._task.cancel()
+        self._task = self.hass.async_create_background_task(
+            self._async_move(cell),
+            f"{DOMAIN} resolve {self.entity_id}"
+        )
+
+    async def _async_move(self, cell):
+        """Look up the cell and move the coordinator there."""
+        try:
+            location = await async_get_geo_cache(self.hass).async_resolve(
+                cell,
+                self.geo_base,
+                self.coordinator.api_key,
+                self.coordinator.rate_limiter
+            )
+        except Exception as err:
+            _LOGGER.warning("Could not resolve %s for %s: %s", cell, self.entity_id, err)
+            self.cell = None
+            return
+        # 解析期间位置又变化时放弃本次结果
+        if cell != self.cell:
+            return
+        if location is None:
+            # 查询失败时允许在同一格网内重试
+            self.cell = None
+            return
+        await self.coordinator.async_set_location(location, cell_coordinates(cell))
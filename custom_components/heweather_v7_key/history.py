@@ -0,0 +1,230 @@
+"""In-memory time series of numeric fields with rolling statistics."""
+from array import array
+from collections import deque
+from datetime import datetime
+import time
+
+from .const import (
+    HISTORY_CAPACITY,
+    HISTORY_WINDOW,
+    HISTORY_FIELDS,
+    PRESSURE_TREND_THRESHOLD
+)
+
+class TimeSeries:
+    """Fixed-capacity ring buffer of (timestamp, value) samples.
+
+    Appending is O(1) (amortized for min/max). Samples older than
+    ``window`` seconds or beyond ``capacity`` are evicted from the front,
+    and the rolling sum, min, max and least-squares slope are kept up to
+    date on every append and eviction.
+    """
+
+    def __init__(self, capacity=HISTORY_CAPACITY, window=HISTORY_WINDOW):
+        """Initialize an empty series."""
+        self.capacity = capacity
+        self.window = window
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        # 全局序号：_head 为最早样本，_tail 为下一个写入位置
+        self._head = 0
+        self._tail = 0
+        self._origin = None
+        # 最小二乘所需的累计和（时间以小时计，相对 _origin）
+        self._sum_t = 0.0
+        self._sum_v = 0.0
+        self._sum_tt = 0.0
+        self._sum_tv = 0.0
+        self._evictions = 0
+        # 单调队列维护滚动最小/最大值：(序号, 数值)
+        self._min = deque()
+        self._max = deque()
+
+    def __len__(self):
+        """Return the number of samples in the window."""
+        return self._tail - self._head
+
+    def _hours(self, timestamp):
+        """Return a timestamp in hours relative to the first sample."""
+        return (timestamp - self._origin) / 3600
+
+    def _evict(self):
+        """Drop the oldest sample."""
+        index = self._head
+        slot = index % self.capacity
+        hours = self._hours(self._times[slot])
+        value = self._values[slot]
+        self._sum_t -= hours
+        self._sum_v -= value
+        self._sum_tt -= hours * hours
+        self._sum_tv -= hours * value
+        if self._min and self._min[0][0] == index:
+            self._min.popleft()
+        if self._max and self._max[0][0] == index:
+            self._max.popleft()
+        self._head += 1
+
+        # 定期重算累计和，避免浮点误差累积
+        self._evictions += 1
+        if self._evictions >= self.capacity:
+            self._evictions = 0
+            self._resum()
+
+    def _resum(self):
+        """Recompute the running sums from the stored samples."""
+        self._sum_t = self._sum_v = self._sum_tt = self._sum_tv = 0.0
+        for index in range(self._head, self._tail):
+            slot = index % self.capacity
+            hours = self._hours(self._times[slot])
+            value = self._values[slot]
+            self._sum_t += hours
+            self._sum_v += value
+            self._sum_tt += hours * hours
+            self._sum_tv += hours * value
+
+    def append(self, timestamp, value):
+        """Add a sample; samples must arrive in time order."""
+        if self._origin is None:
+            self._origin = timestamp
+        while len(self) and (
+            len(self) >= self.capacity
+            or self._times[self._head % self.capacity] < timestamp - self.window
+        ):
+            self._evict()
+
+        index = self._tail
+        slot = index % self.capacity
+        self._times[slot] = timestamp
+        self._values[slot] = value
+        self._tail += 1
+
+        hours = self._hours(timestamp)
+        self._sum_t += hours
+        self._sum_v += value
+        self._sum_tt += hours * hours
+        self._sum_tv += hours * value
+
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((index, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((index, value))
+
+    @property
+    def latest_time(self):
+        """Return the timestamp of the newest sample, or None."""
+        return self._times[(self._tail - 1) % self.capacity] if len(self) else None
+
+    @property
+    def latest(self):
+        """Return the newest value, or None."""
+        return self._values[(self._tail - 1) % self.capacity] if len(self) else None
+
+    @property
+    def minimum(self):
+        """Return the minimum over the window, or None."""
+        return self._min[0][1] if self._min else None
+
+    @property
+    def maximum(self):
+        """Return the maximum over the window, or None."""
+        return self._max[0][1] if self._max else None
+
+    @property
+    def mean(self):
+        """Return the mean over the window, or None."""
+        return self._sum_v / len(self) if len(self) else None
+
+    @property
+    def slope(self):
+        """Return the least-squares slope in units per hour, or None."""
+        count = len(self)
+        if count < 2:
+            return None
+        denominator = count * self._sum_tt - self._sum_t * self._sum_t
+        if abs(denominator) < 1e-9:
+            return None
+        return (count * self._sum_tv - self._sum_t * self._sum_v) / denominator
+
+    def value_at(self, timestamp):
+        """Return the last value recorded at or before a timestamp, or None."""
+        low, high = self._head, self._tail
+        # 二分查找最后一个时间 <= timestamp 的样本
+        while low < high:
+            middle = (low + high) // 2
+            if self._times[middle % self.capacity] <= timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self._head:
+            return None
+        return self._values[(low - 1) % self.capacity]
+
+    def delta(self, seconds):
+        """Return the change over the last ``seconds``, or None if not covered."""
+        if not len(self):
+            return None
+        earlier = self.value_at(self.latest_time - seconds)
+        return None if earlier is None else self.latest - earlier
+
+def _timestamp(value):
+    """Convert an API time string to a POSIX timestamp; None if invalid."""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+class HeWeatherHistory:
+    """Time series of the numeric fields of the current and air endpoints."""
+
+    def __init__(self):
+        """Initialize an empty series for every tracked field."""
+        self.series = {
+            endpoint_name: {field: TimeSeries() for field in fields}
+            for endpoint_name, (_, fields) in HISTORY_FIELDS.items()
+        }
+
+    def record(self, endpoint_name, record):
+        """Append the fields of a new record; repeated observations are ignored."""
+        time_attribute, _ = HISTORY_FIELDS[endpoint_name]
+        timestamp = _timestamp(getattr(record, time_attribute)) or time.time()
+        for field, series in self.series[endpoint_name].items():
+            value = getattr(record, field)
+            if value is None:
+                continue
+            latest_time = series.latest_time
+            if latest_time is not None and timestamp <= latest_time:
+                continue
+            series.append(timestamp, value)
+
+    def statistic(self, endpoint_name, field, name):
+        """Return one derived statistic for a field."""
+        series = self.series[endpoint_name][field]
+        if name == "trend":
+            # 气压倾向按3小时变化判断，不受24小时窗口内日变化的影响
+            change = series.delta(3 * 3600)
+            if change is None:
+                return None
+            if change >= PRESSURE_TREND_THRESHOLD:
+                return "rising"
+            if change <= -PRESSURE_TREND_THRESHOLD:
+                return "falling"
+            return "steady"
+        if name == "delta_3h":
+            delta = series.delta(3 * 3600)
+            return None if delta is None else round(delta, 1)
+        value = getattr(series, {"min": "minimum", "max": "maximum"}.get(name, name))
+        return None if value is None else round(value, 2)
+
+    def summary(self, endpoint_name, field):
+        """Return the rolling statistics of a field as attributes."""
+        series = self.series[endpoint_name][field]
+        slope = series.slope
+        return {
+            "samples": len(series),
+            "min": series.minimum,
+            "max": series.maximum,
+            "mean": None if series.mean is None else round(series.mean, 2),
+            "slope_per_hour": None if slope is None else round(slope, 3),
+        }
@@ -0,0 +1,162 @@
+"""Low-overhead hot-path metrics for the HeWeather coordinator."""
+from bisect import bisect_left
+import math
+
+from .const import METRICS_LATENCY_BUCKETS
+
+class LatencyHistogram:
+    """Cumulative latency histogram with fixed buckets (seconds)."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        # 最后一个桶为 +Inf
+        self.counts = [0] * (len(METRICS_LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        """Record one observation."""
+        self.counts[bisect_left(METRICS_LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, fraction):
+        """Estimate a quantile as the upper bound of its bucket."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, bucket_count in zip((*METRICS_LATENCY_BUCKETS, math.inf), self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+    def as_dict(self):
+        """Return the histogram as cumulative bucket counts."""
+        buckets = {}
+        seen = 0
+        for bound, bucket_count in zip(METRICS_LATENCY_BUCKETS, self.counts):
+            seen += bucket_count
+            buckets[str(bound)] = seen
+        buckets["+Inf"] = self.count
+        return {"buckets": buckets, "sum": round(self.total, 6), "count": self.count}
+
+class HeWeatherMetrics:
+    """Counters kept by one coordinator; updated inline on the hot path."""
+
+    def __init__(self):
+        """Initialize all counters to zero."""
+        self.latency = {}
+        self.retries = {}
+        self.failures = {}
+        self.parse_seconds = 0.0
+        self.parses = 0
+        self.fanout_seconds = 0.0
+        self.fanouts = 0
+        self.listeners_notified = 0
+
+    def observe_latency(self, endpoint_name, seconds):
+        """Record the latency of one request attempt."""
+        histogram = self.latency.get(endpoint_name)
+        if histogram is None:
+            histogram = self.latency[endpoint_name] = LatencyHistogram()
+        histogram.observe(seconds)
+
+    def record_retry(self, endpoint_name):
+        """Count a retried request."""
+        self.retries[endpoint_name] = self.retries.get(endpoint_name, 0) + 1
+
+    def record_failure(self, endpoint_name):
+        """Count a failed request attempt."""
+        self.failures[endpoint_name] = self.failures.get(endpoint_name, 0) + 1
+
+    def record_parse(self, seconds):
+        """Record the time spent building records from a response."""
+        self.parse_seconds += seconds
+        self.parses += 1
+
+    def record_fanout(self, seconds, notified):
+        """Record one listener fan-out."""
+        self.fanout_seconds += seconds
+        self.fanouts += 1
+        self.listeners_notified += notified
+
+    def latency_quantile(self, fraction):
+        """Estimate a latency quantile (seconds) across all endpoints."""
+        merged = LatencyHistogram()
+        for histogram in self.latency.values():
+            for index, bucket_count in enumerate(histogram.counts):
+                merged.counts[index] += bucket_count
+            merged.count += histogram.count
+        return merged.quantile(fraction)
+
+    @staticmethod
+    def cache_hit_rate(transfer_stats):
+        """Return the share of requests served without a network call (%)."""
+        hits = transfer_stats.get("cache_hits", 0) + transfer_stats.get("coalesced_requests", 0)
+        total = hits + transfer_stats.get("network_requests", 0)
+        return round(hits / total * 100, 1) if total else None
+
+    def snapshot(self, transfer_stats, rate_limiter=None):
+        """Return all metrics as a JSON-friendly dict."""
+        return {
+            "endpoints": {
+                endpoint_name: {
+                    **histogram.as_dict(),
+                    "retries": self.retries.get(endpoint_name, 0),
+                    "failures": self.failures.get(endpoint_name, 0),
+                }
+                for endpoint_name, histogram in self.latency.items()
+            },
+            "retries": sum(self.retries.values()),
+            "failures": sum(self.failures.values()),
+            "bytes_downloaded": transfer_stats.get("bytes_downloaded", 0),
+            "json_parse_seconds": round(transfer_stats.get("json_parse_seconds", 0.0), 6),
+            "record_parse_seconds": round(self.parse_seconds, 6),
+            "record_parses": self.parses,
+            "fanout_seconds": round(self.fanout_seconds, 6),
+            "fanouts": self.fanouts,
+            "listeners_notified": self.listeners_notified,
+            "cache_hit_rate": self.cache_hit_rate(transfer_stats),
+            "quota_remaining": rate_limiter.remaining_today if rate_limiter is not None else None,
+        }
+
+    def prometheus(self, labels, transfer_stats, rate_limiter=None):
+        """Render the metrics in the Prometheus text exposition format."""
+        base = ",".join(f'{key}="{value}"' for key, value in labels.items())
+        lines = []
+
+        lines.append("# TYPE heweather_request_latency_seconds histogram")
+        for endpoint_name, histogram in self.latency.items():
+            label = f'{base},endpoint="{endpoint_name}"'
+            for bound, cumulative in histogram.as_dict()["buckets"].items():
+                lines.append(f'heweather_request_latency_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"heweather_request_latency_seconds_sum{{{label}}} {histogram.total:.6f}")
+            lines.append(f"heweather_request_latency_seconds_count{{{label}}} {histogram.count}")
+
+        for name, values in (("retries", self.retries), ("failures", self.failures)):
+            lines.append(f"# TYPE heweather_request_{name}_total counter")
+            for endpoint_name, value in values.items():
+                lines.append(f'heweather_request_{name}_total{{{base},endpoint="{endpoint_name}"}} {value}')
+
+        counters = (
+            ("heweather_bytes_downloaded_total", transfer_stats.get("bytes_downloaded", 0)),
+            ("heweather_json_parse_seconds_total", transfer_stats.get("json_parse_seconds", 0.0)),
+            ("heweather_record_parse_seconds_total", self.parse_seconds),
+            ("heweather_listener_fanout_seconds_total", self.fanout_seconds),
+            ("heweather_listeners_notified_total", self.listeners_notified),
+            ("heweather_cache_hits_total", transfer_stats.get("cache_hits", 0)),
+            ("heweather_coalesced_requests_total", transfer_stats.get("coalesced_requests", 0)),
+            ("heweather_network_requests_total", transfer_stats.get("network_requests", 0)),
+        )
+        for name, value in counters:
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{{{base}}} {value}")
+
+        if rate_limiter is not None:
+            lines.append("# TYPE heweather_quota_remaining gauge")
+            lines.append(f"heweather_quota_remaining{{{base}}} {rate_limiter.remaining_today}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,324 @@
+"""Parsed, compact records for HeWeather API responses."""
+from dataclasses import dataclass
+from datetime import datetime
+
+def _number(value):
+    """Convert a QWeather numeric string to int or float; None if missing."""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+@dataclass(slots=True)
+class CurrentWeather:
+    """Real-time weather from /v7/weather/now."""
+
+    update_time: str
+    obs_time: str
+    temp: int | float | None
+    feels_like: int | float | None
+    text: str
+    wind_bearing: int | float | None
+    wind_dir: str
+    wind_scale: str
+    wind_speed: int | float | None
+    humidity: int | float | None
+    precip: int | float | None
+    pressure: int | float | None
+    vis: int | float | None
+    cloud: int | float | None
+    dew: int | float | None
+    sources: tuple
+
+    @classmethod
+    def from_api(cls, payload):
+        """Parse an API response."""
+        now = payload.get("now", {})
+        return cls(
+            update_time=payload.get("updateTime", ""),
+            obs_time=now.get("obsTime", ""),
+            temp=_number(now.get("temp")),
+            feels_like=_number(now.get("feelsLike")),
+            text=now.get("text", ""),
+            wind_bearing=_number(now.get("wind360")),
+            wind_dir=now.get("windDir", ""),
+            wind_scale=now.get("windScale", ""),
+            wind_speed=_number(now.get("windSpeed")),
+            humidity=_number(now.get("humidity")),
+            precip=_number(now.get("precip")),
+            pressure=_number(now.get("pressure")),
+            vis=_number(now.get("vis")),
+            cloud=_number(now.get("cloud")),
+            dew=_number(now.get("dew")),
+            sources=tuple(payload.get("refer", {}).get("sources", ())),
+        )
+
+@dataclass(slots=True)
+class DailyForecast:
+    """One day of /v7/weather/7d."""
+
+    fx_date: str
+    text_day: str
+    text_night: str
+    temp_max: int | float | None
+    temp_min: int | float | None
+    humidity: int | float | None
+    precip: int | float | None
+    pressure: int | float | None
+    wind_bearing: int | float | None
+    wind_speed: int | float | None
+    uv_index: int | float | None
+
+    @classmethod
+    def from_api(cls, day):
+        """Parse one element of the daily list."""
+        return cls(
+            fx_date=day.get("fxDate", ""),
+            text_day=day.get("textDay", ""),
+            text_night=day.get("textNight", ""),
+            temp_max=_number(day.get("tempMax")),
+            temp_min=_number(day.get("tempMin")),
+            humidity=_number(day.get("humidity")),
+            precip=_number(day.get("precip")),
+            pressure=_number(day.get("pressure")),
+            wind_bearing=_number(day.get("wind360Day")),
+            wind_speed=_number(day.get("windSpeedDay")),
+            uv_index=_number(day.get("uvIndex")),
+        )
+
+@dataclass(slots=True)
+class ForecastData:
+    """Daily forecast from /v7/weather/7d."""
+
+    update_time: str
+    days: tuple
+
+    @classmethod
+    def from_api(cls, payload):
+        """Parse an API response."""
+        return cls(
+            update_time=payload.get("updateTime", ""),
+            days=tuple(DailyForecast.from_api(day) for day in payload.get("daily", ())),
+        )
+
+@dataclass(slots=True)
+class HourlyForecast:
+    """One hour of /v7/weather/24h (or 72h/168h)."""
+
+    fx_time: str
+    epoch_hour: int
+    text: str
+    temp: int | float | None
+    pop: int | float | None
+    precip: int | float | None
+    wind_bearing: int | float | None
+    wind_speed: int | float | None
+    humidity: int | float | None
+    pressure: int | float | None
+    cloud: int | float | None
+    dew: int | float | None
+
+    @classmethod
+    def from_api(cls, hour):
+        """Parse one element of the hourly list."""
+        fx_time = hour.get("fxTime", "")
+        return cls(
+            fx_time=fx_time,
+            epoch_hour=int(datetime.fromisoformat(fx_time).timestamp()) // 3600,
+            text=hour.get("text", ""),
+            temp=_number(hour.get("temp")),
+            pop=_number(hour.get("pop")),
+            precip=_number(hour.get("precip")),
+            wind_bearing=_number(hour.get("wind360")),
+            wind_speed=_number(hour.get("windSpeed")),
+            humidity=_number(hour.get("humidity")),
+            pressure=_number(hour.get("pressure")),
+            cloud=_number(hour.get("cloud")),
+            dew=_number(hour.get("dew")),
+        )
+
+@dataclass(slots=True)
+class HourlyData:
+    """Hourly forecast from /v7/weather/24h (or 72h/168h)."""
+
+    update_time: str
+    hours: tuple
+
+    @classmethod
+    def from_api(cls, payload):
+        """Parse an API response, skipping hours without a valid time."""
+        hours = []
+        for hour in payload.get("hourly", ()):
+            try:
+                hours.append(HourlyForecast.from_api(hour))
+            except (TypeError, ValueError):
+                continue
+        return cls(update_time=payload.get("updateTime", ""), hours=tuple(hours))
+
+@dataclass(slots=True)
+class MinutelyData:
+    """Two-hour precipitation nowcast from /v7/minutely/5m."""
+
+    update_time: str
+    summary: str
+    start_time: float | None
+    slots: tuple
+
+    @classmethod
+    def from_api(cls, payload):
+        """Parse an API response into 5-minute precipitation slots."""
+        minutely = payload.get("minutely", ())
+        try:
+            start_time = datetime.fromisoformat(minutely[0].get("fxTime", "")).timestamp()
+        except (IndexError, TypeError, ValueError):
+            start_time = None
+        return cls(
+            update_time=payload.get("updateTime", ""),
+            summary=payload.get("summary", ""),
+            start_time=start_time,
+            slots=tuple(_number(item.get("precip")) or 0.0 for item in minutely) if start_time is not None else (),
+        )
+
+@dataclass(slots=True)
+class WeatherWarning:
+    """One active warning from /v7/warning/now."""
+
+    id: str
+    sender: str
+    pub_time: str
+    title: str
+    start_time: str
+    end_time: str
+    status: str
+    level: str
+    severity: str
+    severity_color: str
+    type: str
+    type_name: str
+    text: str
+
+    @classmethod
+    def from_api(cls, warning):
+        """Parse one element of the warning list."""
+        return cls(
+            id=warning.get("id", ""),
+            sender=warning.get("sender", ""),
+            pub_time=warning.get("pubTime", ""),
+            title=warning.get("title", ""),
+            start_time=warning.get("startTime", ""),
+            end_time=warning.get("endTime", ""),
+            status=warning.get("status", ""),
+            level=warning.get("level", ""),
+            severity=warning.get("severity", ""),
+            severity_color=warning.get("severityColor", ""),
+            type=warning.get("type", ""),
+            type_name=warning.get("typeName", ""),
+            text=warning.get("text", ""),
+        )
+
+@dataclass(slots=True)
+class WarningData:
+    """Active warnings from /v7/warning/now."""
+
+    update_time: str
+    warnings: tuple
+
+    @classmethod
+    def from_api(cls, payload):
+        """Parse an API response."""
+        return cls(
+            update_time=payload.get("updateTime", ""),
+            warnings=tuple(WeatherWarning.from_api(warning) for warning in payload.get("warning", ())),
+        )
+
+@dataclass(slots=True)
+class AirQuality:
+    """Real-time air quality from /v7/air/now."""
+
+    update_time: str
+    pub_time: str
+    aqi: int | float | None
+    level: int | float | None
+    category: str
+    primary: str
+    pm10: int | float | None
+    pm2p5: int | float | None
+    no2: int | float | None
+    so2: int | float | None
+    co: int | float | None
+    o3: int | float | None
+
+    @classmethod
+    def from_api(cls, payload):
+        """Parse an API response."""
+        now = payload.get("now", {})
+        return cls(
+            update_time=payload.get("updateTime", ""),
+            pub_time=now.get("pubTime", ""),
+            aqi=_number(now.get("aqi")),
+            level=_number(now.get("level")),
+            category=now.get("category", ""),
+            primary=now.get("primary", ""),
+            pm10=_number(now.get("pm10")),
+            pm2p5=_number(now.get("pm2p5")),
+            no2=_number(now.get("no2")),
+            so2=_number(now.get("so2")),
+            co=_number(now.get("co")),
+            o3=_number(now.get("o3")),
+        )
+
+@dataclass(slots=True)
+class LifeIndex:
+    """One life index from /v7/indices/1d."""
+
+    type: str
+    name: str
+    level: str
+    category: str
+    text: str
+
+    @classmethod
+    def from_api(cls, item):
+        """Parse one element of the daily list."""
+        return cls(
+            type=item.get("type", ""),
+            name=item.get("name", ""),
+            level=item.get("level", ""),
+            category=item.get("category", ""),
+            text=item.get("text", ""),
+        )
+
+@dataclass(slots=True)
+class IndicesData:
+    """Life indices from /v7/indices/1d, keyed by index type."""
+
+    update_time: str
+    by_type: dict
+
+    @classmethod
+    def from_api(cls, payload):
+        """Parse an API response and index the items by type."""
+        return cls(
+            update_time=payload.get("updateTime", ""),
+            by_type={
+                item.get("type"): LifeIndex.from_api(item)
+                for item in payload.get("daily", ())
+            },
+        )
+
+# 各接口对应的解析函数
+PARSERS = {
+    "current": CurrentWeather.from_api,
+    "forecast": ForecastData.from_api,
+    "hourly": HourlyData.from_api,
+    "minutely": MinutelyData.from_api,
+    "warning": WarningData.from_api,
+    "air": AirQuality.from_api,
+    "indices": IndicesData.from_api,
+}
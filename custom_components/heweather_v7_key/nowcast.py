@@ -0,0 +1,72 @@
+"""Minute-level precipitation nowcast and rain start/end detection."""
+from array import array
+from datetime import datetime, timezone
+import time
+
+from .const import (
+    MINUTELY_SLOTS,
+    MINUTELY_SLOT_SECONDS,
+    RAIN_THRESHOLD
+)
+
+class PrecipitationNowcast:
+    """The 2-hour, 5-minute precipitation series of one location.
+
+    Each fetch overwrites a fixed array of slots; the first rainy and first
+    dry slot are computed once per fetch, so reading "rain starts in N
+    minutes" is a subtraction. :meth:`merge` returns the rain start/end
+    transitions to announce as events.
+    """
+
+    def __init__(self):
+        """Initialize an empty nowcast."""
+        self.precip = array("d", bytes(8 * MINUTELY_SLOTS))
+        self.start_time = None
+        self.summary = ""
+        self.update_time = None
+        # 首个有降水的时段与其后首个无降水的时段（时间戳），无则为 None
+        self.rain_start = None
+        self.rain_end = None
+
+    def merge(self, record):
+        """Load a new minutely record; return a list of (event, timestamp) transitions."""
+        if record.update_time == self.update_time or not record.slots:
+            return []
+        was_start, was_end = self.rain_start, self.rain_end
+        self.update_time = record.update_time
+        self.summary = record.summary
+        self.start_time = record.start_time
+
+        rain_start = rain_end = None
+        for index in range(MINUTELY_SLOTS):
+            value = record.slots[index] if index < len(record.slots) else 0.0
+            self.precip[index] = value
+            slot_time = self.start_time + index * MINUTELY_SLOT_SECONDS
+            if rain_start is None:
+                if value >= RAIN_THRESHOLD:
+                    rain_start = slot_time
+            elif rain_end is None and value < RAIN_THRESHOLD:
+                rain_end = slot_time
+        self.rain_start, self.rain_end = rain_start, rain_end
+
+        events = []
+        if rain_start is not None and was_start is None:
+            events.append(("rain_start", rain_start))
+        if rain_end is not None and was_end is None:
+            events.append(("rain_end", rain_end))
+        return events
+
+    def minutes_until_rain(self, now=None):
+        """Return minutes until rain (0 while raining), or None if dry for 2 hours."""
+        if self.rain_start is None:
+            return None
+        now = time.time() if now is None else now
+        if self.rain_end is not None and self.rain_end <= now:
+            return None
+        return max(0, round((self.rain_start - now) / 60))
+
+    def rain_end_datetime(self):
+        """Return when the forecast rain ends, or None."""
+        if self.rain_end is None:
+            return None
+        return datetime.fromtimestamp(self.rain_end, timezone.utc)
@@ -0,0 +1,192 @@
+"""Quota-aware rate limiter shared by all coordinators using one API key."""
+import asyncio
+import logging
+import math
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    DATA_RATE_LIMITERS,
+    ENDPOINT_PRIORITY,
+    DROPPABLE_ENDPOINTS,
+    MAX_INTERVAL_STRETCH,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_MAX_WAIT,
+    RATE_LIMIT_PLAN_INTERVAL,
+    QUOTA_SAFETY_MARGIN
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+class QuotaExceeded(UpdateFailed):
+    """Raised when a request would exceed the daily API quota."""
+
+    def __init__(self, message, retry_after=None):
+        """Initialize with the seconds until a token is expected (None = not today)."""
+        super().__init__(message)
+        self.retry_after = retry_after
+
+@callback
+def async_get_rate_limiter(hass: HomeAssistant, api_key, daily_budget):
+    """Return the rate limiter for an API key, updating its daily budget."""
+    limiters = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_RATE_LIMITERS, {})
+    limiter = limiters.get(api_key)
+    if limiter is None:
+        limiter = limiters[api_key] = HeWeatherRateLimiter(daily_budget)
+    else:
+        limiter.daily_budget = daily_budget
+    return limiter
+
+class HeWeatherRateLimiter:
+    """Token bucket for bursts plus a daily budget spread across the day."""
+
+    def __init__(self, daily_budget, burst=RATE_LIMIT_BURST):
+        """Initialize the rate limiter."""
+        self.daily_budget = daily_budget
+        self.base_burst = burst
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._day = dt_util.now().date()
+        self.used_today = 0
+        self.rejected_today = 0
+        self._demands = {}
+        self._scales = {}
+        self._planned_at = 0.0
+
+    @property
+    def remaining_today(self):
+        """Return the number of calls left in today's budget."""
+        return max(0, self.daily_budget - self.used_today)
+
+    def _roll_day(self):
+        """Reset the daily counters at local midnight."""
+        today = dt_util.now().date()
+        if today != self._day:
+            self._day = today
+            self.used_today = 0
+            self.rejected_today = 0
+            self._planned_at = 0.0
+
+    def _refill(self, now):
+        """Add tokens at the rate that spreads the budget evenly over a day."""
+        rate = self.daily_budget / 86400
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * rate)
+        self._last_refill = now
+
+    async def async_acquire(self, max_wait=RATE_LIMIT_MAX_WAIT):
+        """Take one token, waiting up to max_wait seconds; return False if refused."""
+        self._roll_day()
+        if self.used_today >= self.daily_budget:
+            self.rejected_today += 1
+            return False
+
+        now = time.monotonic()
+        self._refill(now)
+        wait = 0 if self._tokens >= 1 else (1 - self._tokens) * 86400 / self.daily_budget
+        if wait > max_wait:
+            self.rejected_today += 1
+            return False
+
+        # 先预留令牌再等待，避免并发请求抢占同一个令牌
+        self._tokens -= 1
+        self.used_today += 1
+        if wait:
+            await asyncio.sleep(wait)
+        return True
+
+    def retry_after(self):
+        """Return seconds until the next token is expected, or None if today's budget is spent."""
+        if self.used_today >= self.daily_budget:
+            return None
+        self._refill(time.monotonic())
+        return max(0.0, (1 - self._tokens) * 86400 / self.daily_budget)
+
+    def _resize_burst(self):
+        """Size the bucket so one full refresh of every registered endpoint fits."""
+        # 启动时每个接口各需一次请求；新增容量立即可用，日配额仍由规划控制
+        burst = max(self.base_burst, sum(len(intervals) for intervals in self._demands.values()))
+        self._tokens = max(0.0, min(burst, self._tokens + burst - self.burst))
+        self.burst = burst
+
+    @callback
+    def async_register_demand(self, owner, intervals):
+        """Register the refresh intervals (seconds) planned by a coordinator."""
+        self._demands[owner] = {
+            endpoint_name: 86400 / interval
+            for endpoint_name, interval in intervals.items()
+            if interval
+        }
+        self._resize_burst()
+        self._planned_at = 0.0
+
+    @callback
+    def async_unregister_demand(self, owner):
+        """Remove a coordinator's planned demand."""
+        self._demands.pop(owner, None)
+        self._resize_burst()
+        self._planned_at = 0.0
+
+    def endpoint_scale(self, endpoint_name):
+        """Return the interval multiplier for an endpoint (inf = paused)."""
+        self._roll_day()
+        now = time.monotonic()
+        if now - self._planned_at >= RATE_LIMIT_PLAN_INTERVAL:
+            self._plan()
+            self._planned_at = now
+        return self._scales.get(endpoint_name, 1.0)
+
+    def plan_summary(self):
+        """Return the current throttling plan in a JSON-friendly form."""
+        return {
+            endpoint_name: "paused" if scale == math.inf else round(scale, 2)
+            for endpoint_name, scale in self._scales.items()
+        }
+
+    def _plan(self):
+        """Stretch or pause low-priority endpoints if the projected spend exceeds the budget."""
+        # 按剩余时间比例估算今天剩余的调用量
+        now = dt_util.now()
+        seconds_left = max(
+            60,
+            86400 - (now.hour * 3600 + now.minute * 60 + now.second)
+        )
+        remaining = self.daily_budget * QUOTA_SAFETY_MARGIN - self.used_today
+
+        demand = {}
+        for intervals in self._demands.values():
+            for endpoint_name, calls_per_day in intervals.items():
+                demand[endpoint_name] = demand.get(endpoint_name, 0) + calls_per_day * seconds_left / 86400
+
+        scales = {}
+        excess = sum(demand.values()) - max(remaining, 0)
+        # 从最低优先级的接口开始拉长间隔或暂停
+        ordered = sorted(demand, key=lambda name: ENDPOINT_PRIORITY.get(name, 0), reverse=True)
+        for index, endpoint_name in enumerate(ordered):
+            if excess <= 0:
+                break
+            endpoint_demand = demand[endpoint_name]
+            is_last = index == len(ordered) - 1
+            max_saving = endpoint_demand * (1 - 1 / MAX_INTERVAL_STRETCH)
+            if excess < max_saving or (is_last and endpoint_demand > excess):
+                scales[endpoint_name] = endpoint_demand / (endpoint_demand - excess)
+                excess = 0
+            elif endpoint_name in DROPPABLE_ENDPOINTS or is_last:
+                scales[endpoint_name] = math.inf
+                excess -= endpoint_demand
+            else:
+                scales[endpoint_name] = MAX_INTERVAL_STRETCH
+                excess -= max_saving
+
+        if scales != self._scales:
+            _LOGGER.info(
+                "HeWeather quota plan updated (used %d/%d today): %s",
+                self.used_today,
+                self.daily_budget,
+                scales or "no throttling"
+            )
+        self._scales = scales
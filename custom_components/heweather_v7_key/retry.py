@@ -0,0 +1,149 @@
+"""Retry backoff and circuit breakers for HeWeather API requests."""
+import logging
+import random
+import time
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DOMAIN,
+    DATA_BREAKERS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    BREAKER_ENDPOINT_THRESHOLD,
+    BREAKER_HOST_THRESHOLD,
+    BREAKER_COOLDOWN
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+def backoff_delay(attempt, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY):
+    """Return an exponential backoff delay with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+class CircuitBreaker:
+    """Stop calling a failing target until a cool-down period has passed."""
+
+    def __init__(self, name, failure_threshold, cooldown=BREAKER_COOLDOWN):
+        """Initialize the circuit breaker."""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+
+    def can_request(self):
+        """Return True if a request may be sent now."""
+        now = time.monotonic()
+        if self.state == STATE_OPEN and now - self._opened_at >= self.cooldown:
+            # 冷却结束，进入半开状态放行一个探测请求
+            self.state = STATE_HALF_OPEN
+            self._probe_started = None
+        if self.state == STATE_HALF_OPEN:
+            # 探测请求未返回结果（如被取消）时，超过冷却时间再放行下一个
+            return self._probe_started is None or now - self._probe_started >= self.cooldown
+        return self.state == STATE_CLOSED
+
+    def on_request(self):
+        """Mark a request as sent; in half-open state it is the probe."""
+        if self.state == STATE_HALF_OPEN:
+            self._probe_started = time.monotonic()
+
+    def record_success(self):
+        """Close the breaker after a successful request."""
+        if self.state != STATE_CLOSED:
+            _LOGGER.info("Circuit breaker %s closed", self.name)
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._probe_started = None
+
+    def release(self):
+        """End a probe that neither succeeded nor failed, so the next one may start."""
+        self._probe_started = None
+
+    def record_failure(self):
+        """Count a failure and open the breaker when the threshold is reached."""
+        self.failures += 1
+        self._probe_started = None
+        if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != STATE_OPEN:
+                _LOGGER.warning(
+                    "Circuit breaker %s opened after %d failures, pausing for %d sec",
+                    self.name,
+                    self.failures,
+                    self.cooldown
+                )
+            self.state = STATE_OPEN
+            self._opened_at = time.monotonic()
+
+@callback
+def async_get_breakers(hass: HomeAssistant):
+    """Return the circuit breaker registry shared by all config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_BREAKERS not in domain_data:
+        domain_data[DATA_BREAKERS] = HeWeatherCircuitBreakers()
+    return domain_data[DATA_BREAKERS]
+
+class HeWeatherCircuitBreakers:
+    """Circuit breakers per API host and per host endpoint."""
+
+    def __init__(self):
+        """Initialize the registry."""
+        self._breakers = {}
+
+    def _get(self, key, threshold):
+        """Return the breaker for a key, creating it on first use."""
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(key, threshold)
+        return breaker
+
+    def host(self, host):
+        """Return the breaker for an API host."""
+        return self._get(host, BREAKER_HOST_THRESHOLD)
+
+    def endpoint(self, host, path):
+        """Return the breaker for an endpoint on an API host."""
+        return self._get(f"{host}{path}", BREAKER_ENDPOINT_THRESHOLD)
+
+    def allow_request(self, host, path):
+        """Return True if neither the host nor the endpoint breaker is open."""
+        host_breaker = self.host(host)
+        endpoint_breaker = self.endpoint(host, path)
+        if not (host_breaker.can_request() and endpoint_breaker.can_request()):
+            return False
+        host_breaker.on_request()
+        endpoint_breaker.on_request()
+        return True
+
+    def record_success(self, host, path):
+        """Record a successful request."""
+        self.host(host).record_success()
+        self.endpoint(host, path).record_success()
+
+    def record_failure(self, host, path, host_failure):
+        """Record a failed request; network failures also count against the host."""
+        if host_failure:
+            self.host(host).record_failure()
+        else:
+            # 主机有响应（接口返回错误），主机本身视为正常
+            self.host(host).record_success()
+        self.endpoint(host, path).record_failure()
+
+    def release(self, host, path):
+        """Release the probes of a request whose outcome says nothing about the target."""
+        self.host(host).release()
+        self.endpoint(host, path).release()
+
+    def states(self, host, paths):
+        """Return breaker states for a host and its endpoints."""
+        states = {host: self.host(host).state}
+        for path in paths:
+            states[f"{host}{path}"] = self.endpoint(host, path).state
+        return states
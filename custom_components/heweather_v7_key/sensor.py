@@ -2,43 +2,185 @@
 import logging
 from datetime import datetime
 from homeassistant.components.sensor import SensorEntity
+from homeassistant.const import EntityCategory
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 from .const import (
     DOMAIN,
-    CONF_LOCATION,
-    CONF_NAME,
     SENSOR_TYPES,
     ATTR_LAST_UPDATE,
-    ATTR_SOURCE
+    ATTR_SOURCE,
+    ATTR_STALE,
+    ATTRIBUTE_PROFILE_MINIMAL,
+    ATTRIBUTE_PROFILE_FULL,
+    CONF_ATTRIBUTE_PROFILE,
+    CONF_SENSORS,
+    DEFAULT_ATTRIBUTE_PROFILE,
+    SHARED_ATTRIBUTES_SIZE,
+    SIGNAL_WARNING_ADDED,
+    SIGNAL_WARNING_CHANGED
 )
+from . import async_get_entry_coordinators, entry_location_name
+from .broker import async_get_broker
+from .retry import async_get_breakers
 
 _LOGGER = logging.getLogger(__name__)
 
+# 内容相同的属性字典在所有实体间共享同一对象
+_SHARED_ATTRIBUTES = {}
+
+def _shared_attributes(attrs):
+    """Return one shared dict per distinct set of hashable attributes."""
+    key = tuple(attrs.items())
+    try:
+        shared = _SHARED_ATTRIBUTES.get(key)
+    except TypeError:
+        return attrs
+    if shared is not None:
+        return shared
+    if len(_SHARED_ATTRIBUTES) >= SHARED_ATTRIBUTES_SIZE:
+        _SHARED_ATTRIBUTES.clear()
+    _SHARED_ATTRIBUTES[key] = attrs
+    return attrs
+
+def _compile_accessor(sensor_config):
+    """Build a function that reads one sensor's value from the coordinator."""
+    data_type = sensor_config["data_type"]
+
+    if "constant" in sensor_config:
+        constant = sensor_config["constant"]
+        return lambda coordinator: constant
+
+    if "history" in sensor_config:
+        endpoint_name, field = sensor_config["history"]
+        statistic = sensor_config["statistic"]
+        return lambda coordinator: coordinator.history.statistic(endpoint_name, field, statistic)
+
+    if "nowcast" in sensor_config:
+        method = sensor_config["nowcast"]
+        return lambda coordinator: getattr(coordinator.nowcast, method)()
+
+    if "metric" in sensor_config:
+        metric = sensor_config["metric"]
+        return lambda coordinator: coordinator.metric_value(metric)
+
+    if "index_type" in sensor_config:
+        index_type = sensor_config["index_type"]
+
+        def index_accessor(coordinator):
+            indices = coordinator.data.get(data_type)
+            item = indices.by_type.get(index_type) if indices is not None else None
+            return (item.category or "N/A") if item is not None else None
+        return index_accessor
+
+    aggregate = sensor_config.get("aggregate")
+    if aggregate == "count":
+        def count_accessor(coordinator):
+            warnings = coordinator.data.get(data_type)
+            return len(warnings.warnings) if warnings is not None else 0
+        return count_accessor
+    if aggregate == "status":
+        def status_accessor(coordinator):
+            warnings = coordinator.data.get(data_type)
+            return "on" if warnings is not None and warnings.warnings else "off"
+        return status_accessor
+
+    *steps, key = sensor_config["path"]
+    default = sensor_config.get("default")
+
+    def path_accessor(coordinator):
+        node = coordinator.data.get(data_type)
+        if node is None:
+            return default
+        for step in steps:
+            if isinstance(step, int):
+                if len(node) <= step:
+                    return None
+                node = node[step]
+            else:
+                node = getattr(node, step)
+        value = getattr(node, key)
+        return default if value is None or value == "" else value
+    return path_accessor
+
+# 预报传感器对应的天数偏移
+FORECAST_DAY_OFFSETS = {
+    "weather_today": 0,
+    "weather_tomorrow": 1,
+    "weather_day_after": 2
+}
+
+# 启动时一次性编译所有传感器的取值函数
+ACCESSORS = {
+    sensor_type: _compile_accessor(sensor_config)
+    for sensor_type, sensor_config in SENSOR_TYPES.items()
+}
+
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up the HeWeather sensor platform."""
-    coordinator = hass.data[DOMAIN][config_entry.entry_id]
-    
     entities = []
-    location = config_entry.data[CONF_LOCATION]
-    name = config_entry.data.get(CONF_NAME) or f"HeWeather {location}"
+    # 选项中未选择的传感器不创建；未配置时创建全部
+    enabled_sensors = config_entry.data.get(CONF_SENSORS)
+    profile = config_entry.data.get(CONF_ATTRIBUTE_PROFILE, DEFAULT_ATTRIBUTE_PROFILE)
     
-    for sensor_type, sensor_config in SENSOR_TYPES.items():
-        entities.append(HeWeatherSensor(
-            coordinator=coordinator,
-            config_entry=config_entry,
-            sensor_type=sensor_type,
-            sensor_config=sensor_config,
-            name=name
-        ))
+    # 批量模式下每个城市一组传感器
+    for location, coordinator in async_get_entry_coordinators(hass, config_entry).items():
+        name = entry_location_name(config_entry, location)
+        for sensor_type, sensor_config in SENSOR_TYPES.items():
+            if enabled_sensors is not None and sensor_type not in enabled_sensors:
+                continue
+            # 未启用的接口不创建对应传感器
+            data_type = sensor_config["data_type"]
+            if data_type != "meta" and data_type not in coordinator.endpoint_paths:
+                continue
+            entities.append(HeWeatherSensor(
+                coordinator=coordinator,
+                config_entry=config_entry,
+                sensor_type=sensor_type,
+                sensor_config=sensor_config,
+                name=name,
+                profile=profile
+            ))
     
     async_add_entities(entities)
+    keep = {entity.unique_id for entity in entities}
+    
+    # 每条有效预警一个实体，随预警新增/解除动态创建和移除
+    for location, coordinator in async_get_entry_coordinators(hass, config_entry).items():
+        if "warning" not in coordinator.endpoint_paths:
+            continue
+        name = entry_location_name(config_entry, location)
+        keep.update(
+            f"heweather_{coordinator.location_key}_warning_{warning_id}"
+            for warning_id in coordinator.warning_index.warnings
+        )
+        
+        @callback
+        def _async_add_warnings(warnings, coordinator=coordinator, name=name):
+            async_add_entities([
+                HeWeatherWarningSensor(coordinator, warning, name, profile) for warning in warnings
+            ])
+        
+        config_entry.async_on_unload(async_dispatcher_connect(
+            hass, SIGNAL_WARNING_ADDED.format(coordinator.location_key), _async_add_warnings
+        ))
+        _async_add_warnings(list(coordinator.warning_index.warnings.values()))
+    
+    # 从实体注册表移除不再创建的传感器（取消选择的传感器、停机期间解除的预警）
+    registry = er.async_get(hass)
+    for registry_entry in er.async_entries_for_config_entry(registry, config_entry.entry_id):
+        if registry_entry.domain == "sensor" and registry_entry.unique_id not in keep:
+            registry.async_remove(registry_entry.entity_id)
 
 class HeWeatherSensor(SensorEntity):
     """Representation of a HeWeather sensor."""
     
     _attr_has_entity_name = True
     
-    def __init__(self, coordinator, config_entry, sensor_type, sensor_config, name):
+    def __init__(self, coordinator, config_entry, sensor_type, sensor_config, name,
+                 profile=DEFAULT_ATTRIBUTE_PROFILE):
         """Initialize the sensor."""
         self.coordinator = coordinator
         self.config_entry = config_entry
@@ -47,10 +189,20 @@ class HeWeatherSensor(SensorEntity):
         self._attr_native_unit_of_measurement = sensor_config["unit"]
         self._attr_icon = sensor_config["icon"]
         self._data_type = sensor_config["data_type"]
+        self._index_type = sensor_config.get("index_type")
+        self._history = sensor_config.get("history")
+        self._accessor = ACCESSORS[sensor_type]
+        self._profile = profile
+        # 属性缓存：来源记录对象与 (过期标记, 更新时间) 不变时复用
+        self._attrs = None
+        self._attrs_source = None
+        self._attrs_key = None
         self._attr_device_class = sensor_config.get("device_class")
         self._attr_state_class = sensor_config.get("state_class")
+        if "entity_category" in sensor_config:
+            self._attr_entity_category = EntityCategory(sensor_config["entity_category"])
         
-        location = config_entry.data[CONF_LOCATION]
+        location = coordinator.location_key
         self._attr_unique_id = f"heweather_{location}_{sensor_type}"
         
         self._attr_device_info = {
@@ -72,275 +224,151 @@ class HeWeatherSensor(SensorEntity):
     def native_value(self):
         """Return the state of the sensor."""
         try:
-            # 处理信息传感器
-            if self._sensor_type == "info":
-                return "正常"
-                
-            if self._sensor_type == "last_update":
-                return self.coordinator.data.get("last_update", "N/A")
-                        
-            # Handle weather data sensors
-            endpoint_data = self.coordinator.data.get(self._data_type, {})
-            #当前天气
-            if self._data_type == "current":
-                now_data = endpoint_data.get("now", {})
-
-                if self._sensor_type == "temperature":
-                    return now_data.get("temp", 0)
-                elif self._sensor_type == "feels_like":
-                    return now_data.get("feelsLike", 0)
-                
-                elif self._sensor_type == "humidity":
-                    return now_data.get("humidity", 0)
-                
-                elif self._sensor_type == "wind_scale":
-                    return now_data.get("windScale", 0)
-                
-                elif self._sensor_type == "wind_speed":
-                    return now_data.get("windSpeed", 0)
-                
-                elif self._sensor_type == "wind_direction":
-                    return now_data.get("windDir", "N/A") 
-                
-                elif self._sensor_type == "precip":
-                    return now_data.get("precip", 0.0)
-                
-                elif self._sensor_type == "pressure":
-                    return now_data.get("pressure", 0)
-                
-                elif self._sensor_type == "vis":
-                    return now_data.get("vis", 0)
-                
-                elif self._sensor_type == "cloud":
-                    return now_data.get("cloud", 0)
-                
-                elif self._sensor_type == "dew":
-                    return now_data.get("dew", 0)
-                else:
-                    return now_data.get(self._sensor_type, 0)
-
-            #天气预警
-            elif self._data_type == "warning":
-                warnings = endpoint_data.get("warning", [])
-                count = len(warnings)
-                if self._sensor_type == "warning_count":
-                    if count != 0:
-                        return count
-                    else:
-                        return 0
-                elif self._sensor_type == "warning_status":
-                    if count != 0:
-                        return "on"
-                    else:
-                        return "off"
-            #空气质量
-            elif self._data_type == "air":
-                now_data = endpoint_data.get("now", {})
-            
-                if self._sensor_type == "aqi":
-                    return now_data.get("aqi", 0)
-            
-                elif self._sensor_type == "air_quality_level":
-                    return now_data.get("level", 0)
-            
-                elif self._sensor_type == "air_quality_category":
-                    return now_data.get("category", "未知")
-            
-                elif self._sensor_type == "pm25":
-                    return now_data.get("pm2p5", 0)
-            
-                elif self._sensor_type == "pm10":
-                    return now_data.get("pm10", 0)
-            
-                elif self._sensor_type == "primary_pollutant":
-                    return now_data.get("primary", "NA")
-            
-                elif self._sensor_type == "no2":
-                    return now_data.get("no2", "NA")
-            
-                elif self._sensor_type == "so2":
-                    return now_data.get("so2", "NA")
-            
-                elif self._sensor_type == "co":
-                    return now_data.get("co", "NA")
-            
-                elif self._sensor_type == "o3":
-                    return now_data.get("o3", "NA")
-
-            #明天、后天天气 weather_today
-            elif self._data_type == "forecast":
-                daily_data = endpoint_data.get("daily", [])
-                if self._sensor_type == "weather_today" and len(daily_data) > 0:
-                    return daily_data[0].get("textDay", "N/A")
-                if self._sensor_type == "weather_tomorrow" and len(daily_data) > 1:
-                    return daily_data[1].get("textDay", "N/A")
-                if self._sensor_type == "weather_day_after" and len(daily_data) > 2:
-                    return daily_data[2].get("textDay", "N/A")
-
-            #生活指数  
-            elif self._data_type == "indices":
-                daily_data = endpoint_data.get("daily", [])
-                type_mapping = {
-                    "sport_index": "1",
-                    "car_washing_index": "2",
-                    "dressing_index": "3",
-                    "fishing_index": "4",
-                    "uv_index": "5",
-                    "tourism_index": "6",
-                    "allergy_index": "7",
-                    "comfort_index": "8",
-                    "cold_index": "9",
-                    "air_dispersion_index": "10",
-                    "aircon_index": "11",
-                    "sunglass_index": "12",
-                    "makeup_index": "13",
-                    "drying_index": "14",
-                    "traffic_index": "15",
-                    "sunscreen_index": "16"
-                }
-                target_type = type_mapping.get(self._sensor_type)
-                if target_type:
-                    for item in daily_data:
-                        if item.get("type") == target_type:
-                            return item.get("category", "N/A")
-            
-            return None
-            
+            return self._accessor(self.coordinator)
         except Exception as e:
             _LOGGER.error("Error getting sensor value for %s: %s", self._sensor_type, str(e))
             return None
     
     @property
     def extra_state_attributes(self):
-        """Return additional state attributes."""
-        attrs = {
-            ATTR_SOURCE: "HeWeather API V7",
-            ATTR_LAST_UPDATE: self.coordinator.data.get("last_update", ""),
-        }
-        
-        # 添加信息传感器的详细属性
+        """Return additional state attributes, rebuilt only when their source changes."""
+        data = self.coordinator.data
+        # 信息传感器的属性是运行统计，每次读取都重新生成
         if self._sensor_type == "info":
-            attrs.update({
-                "api_calls": self.coordinator._total_api_calls,
-                "successful_calls": self.coordinator._successful_api_calls,
-                "last_update": self.coordinator._last_update_time.isoformat() if self.coordinator._last_update_time else "N/A",
-                "next_update": self.coordinator._next_update_time.isoformat() if self.coordinator._next_update_time else "N/A",
-                "update_duration": self.coordinator.data.get("update_duration", 0),
-                "update_interval": self.coordinator.update_interval_seconds
-            })
+            return self._info_attributes()
         
-        # Add endpoint-specific attributes
-        endpoint_data = self.coordinator.data.get(self._data_type, {})
+        source = data.get(self._data_type)
+        key = (
+            bool(data.get("stale")),
+            data.get("last_update", "") if self._profile == ATTRIBUTE_PROFILE_FULL else None
+        )
+        if self._attrs is None or source is not self._attrs_source or key != self._attrs_key:
+            self._attrs_source = source
+            self._attrs_key = key
+            self._attrs = _shared_attributes(self._build_attributes(source, *key))
+        return self._attrs
+    
+    def _build_attributes(self, endpoint_data, stale, last_update):
+        """Build the attributes for the configured profile."""
+        attrs = {}
+        if self._profile == ATTRIBUTE_PROFILE_FULL:
+            attrs[ATTR_SOURCE] = "HeWeather API V7"
+            attrs[ATTR_LAST_UPDATE] = last_update
+        # 数据来自磁盘快照，尚未被网络刷新确认
+        if stale:
+            attrs[ATTR_STALE] = True
+        if self._profile == ATTRIBUTE_PROFILE_MINIMAL or endpoint_data is None:
+            return attrs
+        full = self._profile == ATTRIBUTE_PROFILE_FULL
+
         #当前天气属性
         if self._sensor_type == "wind_speed":
-            now_data = endpoint_data.get("now", {})
-            wind_dir = now_data.get("windDir", "")
-            wind_scale = now_data.get("windScale", "")
-            
-            if wind_dir:
-                attrs["wind_direction"] = wind_dir
+            if endpoint_data.wind_dir:
+                attrs["wind_direction"] = endpoint_data.wind_dir
             
-            if wind_scale:
-                attrs["wind_scale"] = wind_scale
+            if endpoint_data.wind_scale:
+                attrs["wind_scale"] = endpoint_data.wind_scale
 
         #告警状态属性
         elif self._sensor_type == "warning_status":
-            warnings = endpoint_data.get("warning", [])
+            warnings = endpoint_data.warnings
             count=len(warnings)
             if count==1:
                 attrs["text"] = f"请注意：当前有1个天气预警！"
-                attrs["title"]=warnings[0].get("title", "")
-                attrs["level"]=warnings[0].get("level", "")
-                attrs["typeName"]=warnings[0].get("typeName", "")
-                attrs["description"]=warnings[0].get("text", "")
+                attrs["title"]=warnings[0].title
+                attrs["level"]=warnings[0].level
+                attrs["typeName"]=warnings[0].type_name
+                if full:
+                    attrs["description"]=warnings[0].text
             elif count>=2:
                 attrs["text"] = f"请注意：当前有 {count} 个天气预警！"
                 for i, warning in enumerate(warnings, 1):
-                    attrs[f"title{i}"] = warning.get("title", "")
-                    attrs[f"level{i}"] = warning.get("level", "")
-                    attrs[f"typeName{i}"] = warning.get("typeName", "")
-                    attrs[f"description{i}"] = warning.get("text", "")
+                    attrs[f"title{i}"] = warning.title
+                    attrs[f"level{i}"] = warning.level
+                    attrs[f"typeName{i}"] = warning.type_name
+                    if full:
+                        attrs[f"description{i}"] = warning.text
             else:
                 attrs["text"] = "当前无任何天气预警！"
 
-        #明天、后天天气属性 weather_today
-        elif self._sensor_type == "weather_today":
-            daily_data = endpoint_data.get("daily", [])
-            if len(daily_data) > 0:
-                day = daily_data[0]
-                attrs.update({
-                    "textDay": day.get("textDay", ""),
-                    "textNight": day.get("textNight", ""),
-                    "tempMax": day.get("tempMax", ""),
-                    "tempMin": day.get("tempMin", ""),
-                    "humidity": day.get("humidity", ""),
-                    "text": f'白天：{day.get("textDay", "")}，晚上：{day.get("textNight", "")}。最高气温：{day.get("tempMax", "")}度，最低气温：{day.get("tempMin", "")}度。湿度：{day.get("humidity", "")}%。'
-                })
-        elif self._sensor_type == "weather_tomorrow":
-            daily_data = endpoint_data.get("daily", [])
-            if len(daily_data) > 1:
-                day = daily_data[1]
-                attrs.update({
-                    "textDay": day.get("textDay", ""),
-                    "textNight": day.get("textNight", ""),
-                    "tempMax": day.get("tempMax", ""),
-                    "tempMin": day.get("tempMin", ""),
-                    "humidity": day.get("humidity", ""),
-                    "text": f'白天：{day.get("textDay", "")}，晚上：{day.get("textNight", "")}。最高气温：{day.get("tempMax", "")}度，最低气温：{day.get("tempMin", "")}度。湿度：{day.get("humidity", "")}%。'
-                })
-        
-        elif self._sensor_type == "weather_day_after":
-            daily_data = endpoint_data.get("daily", [])
-            if len(daily_data) > 2:
-                day = daily_data[2]
+        #今天、明天、后天天气属性
+        elif self._sensor_type in FORECAST_DAY_OFFSETS:
+            offset = FORECAST_DAY_OFFSETS[self._sensor_type]
+            if len(endpoint_data.days) > offset:
+                day = endpoint_data.days[offset]
                 attrs.update({
-                    "textDay": day.get("textDay", ""),
-                    "textNight": day.get("textNight", ""),
-                    "tempMax": day.get("tempMax", ""),
-                    "tempMin": day.get("tempMin", ""),
-                    "humidity": day.get("humidity", ""),
-                    "text": f'白天：{day.get("textDay", "")}，晚上：{day.get("textNight", "")}。最高气温：{day.get("tempMax", "")}度，最低气温：{day.get("tempMin", "")}度。湿度：{day.get("humidity", "")}%。'
+                    "textDay": day.text_day,
+                    "textNight": day.text_night,
+                    "tempMax": day.temp_max,
+                    "tempMin": day.temp_min,
+                    "humidity": day.humidity
                 })
+                if full:
+                    attrs["text"] = f'白天：{day.text_day}，晚上：{day.text_night}。最高气温：{day.temp_max}度，最低气温：{day.temp_min}度。湿度：{day.humidity}%。'
+
+        #历史统计
+        if self._history is not None:
+            attrs.update(self.coordinator.history.summary(*self._history))
+
         #生活指数  
-        if self._data_type == "indices":
-            daily_data = endpoint_data.get("daily", [])
-            type_mapping = {
-                "sport_index": "1",
-                "car_washing_index": "2",
-                "dressing_index": "3",
-                "fishing_index": "4",
-                "uv_index": "5",
-                "tourism_index": "6",
-                "allergy_index": "7",
-                "comfort_index": "8",
-                "cold_index": "9",
-                "air_dispersion_index": "10",
-                "aircon_index": "11",
-                "sunglass_index": "12",
-                "makeup_index": "13",
-                "drying_index": "14",
-                "traffic_index": "15",
-                "sunscreen_index": "16"
-            }
-            target_type = type_mapping.get(self._sensor_type)
-            if target_type:
-                for item in daily_data:
-                    if item.get("type") == target_type:
-                        attrs.update({
-                            "name": item.get("name", ""),
-                            "level": item.get("level", ""),
-                            "text": item.get("text", "")
-                        })
-                        break
+        if self._index_type is not None:
+            item = endpoint_data.by_type.get(self._index_type)
+            if item is not None:
+                attrs["name"] = item.name
+                attrs["level"] = item.level
+                if full:
+                    attrs["text"] = item.text
         
         return attrs
     
+    def _info_attributes(self):
+        """Return the request statistics of the info sensor."""
+        attrs = {}
+        if self.coordinator.data.get("stale"):
+            attrs[ATTR_STALE] = True
+        if self._profile == ATTRIBUTE_PROFILE_MINIMAL:
+            return _shared_attributes(attrs)
+        
+        broker = async_get_broker(self.hass)
+        attrs.update({
+            "api_calls": self.coordinator._total_api_calls,
+            "successful_calls": self.coordinator._successful_api_calls,
+            "last_update": self.coordinator._last_update_time.isoformat() if self.coordinator._last_update_time else "N/A",
+            "next_update": self.coordinator._next_update_time.isoformat() if self.coordinator._next_update_time else "N/A",
+            "update_duration": self.coordinator.data.get("update_duration", 0),
+            "endpoint_durations": self.coordinator.data.get("endpoint_durations", {}),
+            "max_concurrent_requests": self.coordinator.max_concurrent_requests,
+            "update_interval": self.coordinator.update_interval_seconds,
+            "endpoint_intervals": self.coordinator.endpoint_intervals,
+            "publish_periods": self.coordinator.publish_periods(),
+            "network_requests": broker.network_requests,
+            "coalesced_requests": broker.coalesced_requests,
+            "cache_hits": broker.cache_hits
+        })
+        attrs.update(self.coordinator.transfer_stats)
+        attrs["circuit_breakers"] = async_get_breakers(self.hass).states(
+            self.coordinator.api_host,
+            self.coordinator.endpoint_paths.values()
+        )
+        limiter = self.coordinator.rate_limiter
+        if limiter is not None:
+            attrs.update({
+                "daily_quota": limiter.daily_budget,
+                "quota_used_today": limiter.used_today,
+                "quota_remaining": limiter.remaining_today,
+                "quota_rejected_today": limiter.rejected_today,
+                "interval_scales": limiter.plan_summary()
+            })
+        return attrs
+    
     async def async_added_to_hass(self):
         """When entity is added to hass."""
         await super().async_added_to_hass()
+        # 只订阅本传感器读取的接口，其他接口变化时不写入状态
         self.async_on_remove(
             self.coordinator.async_add_listener(
-                self.async_write_ha_state
+                self.async_write_ha_state,
+                frozenset({self._data_type})
             )
         )
     
@@ -351,4 +379,80 @@ class HeWeatherSensor(SensorEntity):
     @property
     def should_poll(self):
         """No need to poll, coordinator notifies of updates."""
-        return False
\ No newline at end of file
+        return False
+
+class HeWeatherWarningSensor(SensorEntity):
+    """One active weather warning; removed when the warning is lifted."""
+    
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_icon = "mdi:alert"
+    
+    def __init__(self, coordinator, warning, name, profile=DEFAULT_ATTRIBUTE_PROFILE):
+        """Initialize the warning sensor."""
+        self.coordinator = coordinator
+        self._warning = warning
+        self._profile = profile
+        self._attrs = None
+        self._attrs_source = None
+        self._attr_name = warning.type_name or warning.title
+        self._attr_unique_id = f"heweather_{coordinator.location_key}_warning_{warning.id}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, coordinator.location_key)},
+            "name": name,
+            "manufacturer": "HeWeather",
+        }
+    
+    @property
+    def native_value(self):
+        """Return the warning color level."""
+        return self._warning.severity_color or self._warning.level or self._warning.severity
+    
+    @property
+    def extra_state_attributes(self):
+        """Return the warning details, rebuilt only when the warning changes."""
+        warning = self._warning
+        if warning is self._attrs_source:
+            return self._attrs
+        attrs = {"id": warning.id}
+        if self._profile != ATTRIBUTE_PROFILE_MINIMAL:
+            attrs.update({
+                "title": warning.title,
+                "sender": warning.sender,
+                "type": warning.type,
+                "severity": warning.severity,
+                "pub_time": warning.pub_time,
+                "start_time": warning.start_time,
+                "end_time": warning.end_time,
+            })
+        if self._profile == ATTRIBUTE_PROFILE_FULL:
+            attrs["description"] = warning.text
+        self._attrs_source = warning
+        self._attrs = attrs
+        return attrs
+    
+    async def async_added_to_hass(self):
+        """Subscribe to changes of this warning only."""
+        await super().async_added_to_hass()
+        self.async_on_remove(async_dispatcher_connect(
+            self.hass,
+            SIGNAL_WARNING_CHANGED.format(self.coordinator.location_key, self._warning.id),
+            self._async_warning_changed
+        ))
+    
+    @callback
+    def _async_warning_changed(self, warning):
+        """Update the warning, or remove the entity once it is lifted."""
+        if warning is not None:
+            self._warning = warning
+            self.async_write_ha_state()
+            return
+        self.hass.async_create_task(self._async_remove_warning())
+    
+    async def _async_remove_warning(self):
+        """Remove this entity and its registry entry."""
+        entity_id = self.entity_id
+        await self.async_remove(force_remove=True)
+        registry = er.async_get(self.hass)
+        if registry.async_get(entity_id) is not None:
+            registry.async_remove(entity_id)
@@ -0,0 +1,60 @@
+"""Shared HTTP session for the HeWeather integration."""
+import logging
+
+import aiohttp
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DOMAIN,
+    DATA_SESSION,
+    CONNECTION_LIMIT_PER_HOST,
+    DNS_CACHE_TTL,
+    KEEPALIVE_TIMEOUT
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# 请求压缩传输；仅在可解码brotli时声明br
+try:
+    import brotli  # noqa: F401
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+else:
+    ACCEPT_ENCODING = "gzip, deflate, br"
+
+@callback
+def async_get_session(hass: HomeAssistant) -> aiohttp.ClientSession:
+    """Return the pooled session shared by all HeWeather config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    session = domain_data.get(DATA_SESSION)
+    if session is not None and not session.closed:
+        return session
+
+    connector = aiohttp.TCPConnector(
+        limit_per_host=CONNECTION_LIMIT_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+    session = aiohttp.ClientSession(
+        connector=connector,
+        headers={"Accept-Encoding": ACCEPT_ENCODING},
+    )
+    domain_data[DATA_SESSION] = session
+
+    async def _async_close_session(_event):
+        """Close the session when Home Assistant stops."""
+        if not session.closed:
+            await session.close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_session)
+    _LOGGER.debug("Created shared HeWeather HTTP session")
+    return session
+
+async def async_close_session(hass: HomeAssistant):
+    """Close the shared session once no config entry uses it anymore."""
+    session = hass.data.get(DOMAIN, {}).pop(DATA_SESSION, None)
+    if session is not None and not session.closed:
+        await session.close()
+        _LOGGER.debug("Closed shared HeWeather HTTP session")
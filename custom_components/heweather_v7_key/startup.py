@@ -0,0 +1,68 @@
+"""Staggered startup shared by all HeWeather config entries."""
+import asyncio
+import hashlib
+import random
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+
+from .const import (
+    DOMAIN,
+    DATA_STARTUP,
+    STARTUP_MAX_CONCURRENT_REFRESHES
+)
+
+@callback
+def async_get_startup_scheduler(hass: HomeAssistant):
+    """Return the startup scheduler shared by all config entries."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_STARTUP not in domain_data:
+        domain_data[DATA_STARTUP] = HeWeatherStartupScheduler(hass)
+    return domain_data[DATA_STARTUP]
+
+def entry_phase(key):
+    """Return a deterministic phase in [0, 1) for a config entry or location."""
+    digest = hashlib.sha1(key.encode()).digest()
+    return int.from_bytes(digest[:4], "big") / 2 ** 32
+
+class HeWeatherStartupScheduler:
+    """Limit and spread the initial refreshes of all entries at boot."""
+
+    def __init__(self, hass):
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._semaphore = asyncio.Semaphore(STARTUP_MAX_CONCURRENT_REFRESHES)
+
+    async def async_initial_refresh(self, refresh, jitter=0):
+        """Run a first refresh after a random delay, bounded by the global limit."""
+        if jitter:
+            await asyncio.sleep(random.uniform(0, jitter))
+        async with self._semaphore:
+            await refresh()
+
+    @callback
+    def async_track_phased_interval(self, action, interval, phase):
+        """Like async_track_time_interval, but first fire after phase * interval.
+
+        Timers registered at the same moment during boot would otherwise
+        stay aligned and fire together every cycle.
+        """
+        unsub_interval = None
+
+        @callback
+        def start(_now):
+            nonlocal unsub_interval, unsub_delay
+            unsub_delay = None
+            unsub_interval = async_track_time_interval(self.hass, action, interval)
+
+        unsub_delay = async_call_later(self.hass, timedelta(seconds=interval.total_seconds() * phase), start)
+
+        @callback
+        def unsubscribe():
+            if unsub_delay is not None:
+                unsub_delay()
+            if unsub_interval is not None:
+                unsub_interval()
+
+        return unsubscribe
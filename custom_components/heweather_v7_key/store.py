@@ -0,0 +1,74 @@
+"""Persistent snapshot of the last good HeWeather payloads."""
+import logging
+from datetime import datetime
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    API_ENDPOINTS,
+    SNAPSHOT_STORAGE_VERSION,
+    SNAPSHOT_SAVE_DELAY
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# 快照中不保存的字段（链接与版权信息），保持文件紧凑
+_SNAPSHOT_DROP_KEYS = ("fxLink", "refer")
+
+class HeWeatherSnapshotStore:
+    """Debounced, atomic on-disk store of the last payload per endpoint."""
+
+    def __init__(self, hass: HomeAssistant, storage_id):
+        """Initialize the snapshot store."""
+        self._store = Store(
+            hass,
+            SNAPSHOT_STORAGE_VERSION,
+            f"{DOMAIN}.{storage_id}",
+            atomic_writes=True,
+        )
+        self._data = {}
+
+    async def async_load(self):
+        """Load the saved payloads, keyed by endpoint name."""
+        try:
+            stored = await self._store.async_load()
+        except Exception as err:
+            _LOGGER.warning("Failed to load HeWeather snapshot: %s", err)
+            return {}, None
+
+        if not stored:
+            return {}, None
+
+        endpoints = {
+            endpoint_name: payload
+            for endpoint_name, payload in stored.get("endpoints", {}).items()
+            if endpoint_name in API_ENDPOINTS
+        }
+        return endpoints, stored.get("saved_at")
+
+    @callback
+    def async_schedule_save(self, data):
+        """Schedule a debounced write of the current endpoint payloads."""
+        self._data = data
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self):
+        """Return the compact snapshot written to disk."""
+        return {
+            "saved_at": datetime.now().isoformat(),
+            "endpoints": {
+                endpoint_name: {
+                    key: value for key, value in self._data[endpoint_name].items()
+                    if key not in _SNAPSHOT_DROP_KEYS
+                }
+                for endpoint_name in API_ENDPOINTS
+                if endpoint_name in self._data
+            },
+        }
+
+    async def async_remove(self):
+        """Delete the snapshot from disk."""
+        await self._store.async_remove()
@@ -0,0 +1,26 @@
+"""Index active weather warnings by id and diff them between refreshes."""
+
+class WarningIndex:
+    """Active warnings keyed by id; each update returns only what changed."""
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self.warnings = {}
+
+    def update(self, warnings):
+        """Replace the active set; return (added, updated, removed) lists."""
+        current = {warning.id: warning for warning in warnings if warning.id}
+        added = []
+        updated = []
+        for warning_id, warning in current.items():
+            previous = self.warnings.get(warning_id)
+            if previous is None:
+                added.append(warning)
+            elif previous != warning:
+                updated.append(warning)
+        removed = [
+            warning for warning_id, warning in self.warnings.items()
+            if warning_id not in current
+        ]
+        self.warnings = current
+        return added, updated, removed
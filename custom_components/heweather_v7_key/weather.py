@@ -1,3 +1,7 @@
+import logging
+
+from homeassistant.core import callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.components.weather import (
     WeatherEntity,
     WeatherEntityFeature,
@@ -5,6 +9,11 @@ from homeassistant.components.weather import (
     ATTR_FORECAST_CONDITION,
     ATTR_FORECAST_NATIVE_TEMP,
     ATTR_FORECAST_NATIVE_TEMP_LOW,
+    ATTR_FORECAST_NATIVE_PRECIPITATION,
+    ATTR_FORECAST_NATIVE_WIND_SPEED,
+    ATTR_FORECAST_PRECIPITATION_PROBABILITY,
+    ATTR_FORECAST_HUMIDITY,
+    ATTR_FORECAST_WIND_BEARING,
     ATTR_FORECAST_TIME,
     ATTR_WEATHER_HUMIDITY,
     ATTR_WEATHER_PRESSURE,
@@ -14,13 +23,21 @@ from homeassistant.components.weather import (
     ATTR_WEATHER_VISIBILITY,
 )
 
+from . import async_get_entry_coordinators, entry_location_name
 from .const import (
     DOMAIN,
-    CONF_LOCATION,
-    CONF_NAME,
-    ATTR_LAST_UPDATE
+    ATTR_LAST_UPDATE,
+    ATTR_STALE,
+    ATTRIBUTE_PROFILE_MINIMAL,
+    ATTRIBUTE_PROFILE_FULL,
+    CONF_ATTRIBUTE_PROFILE,
+    CONF_WEATHER_ENTITY,
+    DEFAULT_ATTRIBUTE_PROFILE,
+    DEFAULT_WEATHER_ENTITY
 )
 
+_LOGGER = logging.getLogger(__name__)
+
 HEWEATHER_CONDITION_MAP = {
     "晴": "sunny",
     "少云": "partlycloudy",
@@ -76,29 +93,51 @@ HEWEATHER_CONDITION_MAP = {
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up the weather platform."""
-    coordinator = hass.data[DOMAIN][config_entry.entry_id]
-    
-    location = config_entry.data[CONF_LOCATION]
-    name = config_entry.data.get(CONF_NAME) or f"HeWeather {location}"
+    profile = config_entry.data.get(CONF_ATTRIBUTE_PROFILE, DEFAULT_ATTRIBUTE_PROFILE)
+    # 关闭天气实体或未选择实时天气接口时不创建天气实体
+    entities = [
+        HeWeatherEntity(coordinator, config_entry, entry_location_name(config_entry, location), profile)
+        for location, coordinator in async_get_entry_coordinators(hass, config_entry).items()
+        if config_entry.data.get(CONF_WEATHER_ENTITY, DEFAULT_WEATHER_ENTITY)
+        and "current" in coordinator.endpoint_paths
+    ]
+    async_add_entities(entities)
     
-    async_add_entities([HeWeatherEntity(coordinator, config_entry, name)])
+    # 从实体注册表移除不再创建的天气实体
+    keep = {entity.unique_id for entity in entities}
+    registry = er.async_get(hass)
+    for registry_entry in er.async_entries_for_config_entry(registry, config_entry.entry_id):
+        if registry_entry.domain == "weather" and registry_entry.unique_id not in keep:
+            registry.async_remove(registry_entry.entity_id)
 
 class HeWeatherEntity(WeatherEntity):
     """Representation of HeWeather data."""
     
     _attr_has_entity_name = True
-    _attr_supported_features = (
-        WeatherEntityFeature.FORECAST_DAILY
-    )
     
-    def __init__(self, coordinator, config_entry, name):
+    def __init__(self, coordinator, config_entry, name, profile=DEFAULT_ATTRIBUTE_PROFILE):
         self.coordinator = coordinator
         self.config_entry = config_entry
         self._attr_name = name
-        self._attr_unique_id = f"heweather_{config_entry.data[CONF_LOCATION]}_weather"
+        self._attr_unique_id = f"heweather_{coordinator.location_key}_weather"
+        # 只声明已启用接口对应的预报类型
+        self._attr_supported_features = WeatherEntityFeature(0)
+        if "forecast" in coordinator.endpoint_paths:
+            self._attr_supported_features |= WeatherEntityFeature.FORECAST_DAILY
+        if "hourly" in coordinator.endpoint_paths:
+            self._attr_supported_features |= WeatherEntityFeature.FORECAST_HOURLY
+        self._profile = profile
+        self._attrs_key = None
+        self._attrs = None
+        # 每日预报缓存：按接口的 updateTime 记忆
+        self._daily_key = None
+        self._daily_cache = []
+        # 逐小时预报缓存：(存储版本, 当前小时) -> 预报列表
+        self._hourly_key = None
+        self._hourly_cache = []
         
         self._attr_device_info = {
-            "identifiers": {(DOMAIN, config_entry.data[CONF_LOCATION])},
+            "identifiers": {(DOMAIN, coordinator.location_key)},
             "name": name,
             "manufacturer": "HeWeather",
         }
@@ -109,22 +148,23 @@ class HeWeatherEntity(WeatherEntity):
         # 添加对"current"键的检查
         return self.coordinator.last_update_success and "current" in self.coordinator.data
     
+    @property
+    def _current(self):
+        """Return the parsed real-time weather record."""
+        return self.coordinator.data.get("current")
+    
     @property
     def condition(self):
         """Return the current condition."""
-        current_data = self.coordinator.data.get("current", {})
-        condition_text = current_data.get("now", {}).get("text", "")
+        current = self._current
+        condition_text = current.text if current is not None else ""
         return HEWEATHER_CONDITION_MAP.get(condition_text, "exceptional")
     
     @property
     def native_temperature(self):
         """Return the temperature."""
-        current_data = self.coordinator.data.get("current", {})
-        temp = current_data.get("now", {}).get("temp", 0)
-        try:
-            return float(temp)
-        except (TypeError, ValueError):
-            return 0
+        current = self._current
+        return current.temp if current is not None and current.temp is not None else 0
     
     @property
     def native_temperature_unit(self):
@@ -132,98 +172,145 @@ class HeWeatherEntity(WeatherEntity):
     
     @property
     def humidity(self):
-        current_data = self.coordinator.data.get("current", {})
-        humidity = current_data.get("now", {}).get("humidity", 0)
-        try:
-            return float(humidity)
-        except (TypeError, ValueError):
-            return 0
+        current = self._current
+        return current.humidity if current is not None and current.humidity is not None else 0
     
     @property
     def native_wind_speed(self):
-        current_data = self.coordinator.data.get("current", {})
-        wind_speed = current_data.get("now", {}).get("windSpeed", 0)
-        try:
-            return float(wind_speed)
-        except (TypeError, ValueError):
-            return 0
+        current = self._current
+        return current.wind_speed if current is not None and current.wind_speed is not None else 0
     
     @property
     def wind_bearing(self):
-        current_data = self.coordinator.data.get("current", {})
-        return current_data.get("now", {}).get("windDir", "")
+        current = self._current
+        return current.wind_dir if current is not None else ""
     
     @property
     def native_pressure(self):
-        current_data = self.coordinator.data.get("current", {})
-        pressure = current_data.get("now", {}).get("pressure", 0)
-        try:
-            return float(pressure)
-        except (TypeError, ValueError):
-            return 0
+        current = self._current
+        return current.pressure if current is not None and current.pressure is not None else 0
     
     @property
     def native_visibility(self):
-        current_data = self.coordinator.data.get("current", {})
-        vis = current_data.get("now", {}).get("vis", 0)
-        try:
-            return float(vis)
-        except (TypeError, ValueError):
-            return 0
+        current = self._current
+        return current.vis if current is not None and current.vis is not None else 0
     
     @property
     def attribution(self):
         """Return the attribution."""
-        current_data = self.coordinator.data.get("current", {})
-        sources = current_data.get("refer", {}).get("sources", [])
+        current = self._current
+        sources = current.sources if current is not None else ()
         return f"Data from: {', '.join(sources)}" if sources else "HeWeather API V7"
     
     @property
     def extra_state_attributes(self):
-        """Return additional state attributes."""
-        attrs = {
-            ATTR_LAST_UPDATE: self.coordinator.data.get("last_update", "")
-        }
+        """Return additional state attributes, rebuilt only when their source changes."""
+        current = self._current
+        stale = bool(self.coordinator.data.get("stale"))
+        last_update = self.coordinator.data.get("last_update", "") if self._profile == ATTRIBUTE_PROFILE_FULL else None
+        key = (stale, last_update, current.wind_scale if current is not None else None)
+        if key == self._attrs_key:
+            return self._attrs
         
+        attrs = {}
+        if last_update is not None:
+            attrs[ATTR_LAST_UPDATE] = last_update
+        if stale:
+            attrs[ATTR_STALE] = True
         # 添加对"current"键的检查
-        current_data = self.coordinator.data.get("current", {})
-        wind_scale = current_data.get("now", {}).get("windScale", "")
-        if wind_scale:
-            attrs["wind_scale"] = wind_scale
-        
+        if current is not None and current.wind_scale and self._profile != ATTRIBUTE_PROFILE_MINIMAL:
+            attrs["wind_scale"] = current.wind_scale
+        self._attrs_key = key
+        self._attrs = attrs
         return attrs
     
     async def async_forecast_daily(self):
-        """Return the daily forecast."""
-        forecasts = []
+        """Return the daily forecast, rebuilt only when updateTime changes."""
         # 添加对"forecast"键的检查
-        forecast_data = self.coordinator.data.get("forecast", {})
-        daily_data = forecast_data.get("daily", [])
+        forecast_data = self.coordinator.data.get("forecast")
+        if forecast_data is None:
+            return []
+        if forecast_data.update_time == self._daily_key:
+            return self._daily_cache
         
-        for day in daily_data[:7]:
-            try:
-                condition_text = day.get("textDay", "")
-                forecast = {
-                    ATTR_FORECAST_TIME: day.get("fxDate", ""),
-                    ATTR_FORECAST_CONDITION: HEWEATHER_CONDITION_MAP.get(condition_text, "exceptional"),
-                    ATTR_FORECAST_NATIVE_TEMP: float(day.get("tempMax", 0)),
-                    ATTR_FORECAST_NATIVE_TEMP_LOW: float(day.get("tempMin", 0))
-                }
-                forecasts.append(forecast)
-            except (TypeError, ValueError) as e:
-                _LOGGER.error("Error parsing daily forecast data: %s", e)
+        forecasts = []
+        for day in forecast_data.days[:7]:
+            if day.temp_max is None or day.temp_min is None:
+                _LOGGER.error("Error parsing daily forecast data for %s", day.fx_date)
                 continue
+            forecasts.append({
+                ATTR_FORECAST_TIME: day.fx_date,
+                ATTR_FORECAST_CONDITION: HEWEATHER_CONDITION_MAP.get(day.text_day, "exceptional"),
+                ATTR_FORECAST_NATIVE_TEMP: day.temp_max,
+                ATTR_FORECAST_NATIVE_TEMP_LOW: day.temp_min
+            })
         
+        self._daily_key = forecast_data.update_time
+        self._daily_cache = forecasts
         return forecasts
     
+    async def async_forecast_hourly(self):
+        """Return the hourly forecast from the ring buffer."""
+        store = self.coordinator.hourly_store
+        now_hour = store.current_hour()
+        key = (store.version, now_hour)
+        if key == self._hourly_key:
+            return self._hourly_cache
+        
+        forecasts = []
+        for hour in store.upcoming(now_hour):
+            if hour.temp is None:
+                continue
+            forecasts.append({
+                ATTR_FORECAST_TIME: hour.fx_time,
+                ATTR_FORECAST_CONDITION: HEWEATHER_CONDITION_MAP.get(hour.text, "exceptional"),
+                ATTR_FORECAST_NATIVE_TEMP: hour.temp,
+                ATTR_FORECAST_PRECIPITATION_PROBABILITY: hour.pop,
+                ATTR_FORECAST_NATIVE_PRECIPITATION: hour.precip,
+                ATTR_FORECAST_NATIVE_WIND_SPEED: hour.wind_speed,
+                ATTR_FORECAST_WIND_BEARING: hour.wind_bearing,
+                ATTR_FORECAST_HUMIDITY: hour.humidity
+            })
+        
+        self._hourly_key = key
+        self._hourly_cache = forecasts
+        return forecasts
+    
+    @callback
+    def _async_daily_updated(self):
+        """Push the daily forecast to subscribers when it changed."""
+        self.hass.async_create_task(self.async_update_listeners(["daily"]))
+    
+    @callback
+    def _async_hourly_updated(self):
+        """Push the hourly forecast to subscribers when it changed."""
+        self.hass.async_create_task(self.async_update_listeners(["hourly"]))
+    
     async def async_added_to_hass(self):
         """When entity is added to hass."""
         await super().async_added_to_hass()
+        # 只订阅天气实体读取的接口
         self.async_on_remove(
             self.coordinator.async_add_listener(
-                self.async_write_ha_state
+                self.async_write_ha_state,
+                frozenset({"current", "forecast"})
             )
         )
+        # 预报接口有变化时才推送给预报订阅者
+        if self._attr_supported_features & WeatherEntityFeature.FORECAST_DAILY:
+            self.async_on_remove(
+                self.coordinator.async_add_listener(
+                    self._async_daily_updated,
+                    frozenset({"forecast"})
+                )
+            )
+        if self._attr_supported_features & WeatherEntityFeature.FORECAST_HOURLY:
+            self.async_on_remove(
+                self.coordinator.async_add_listener(
+                    self._async_hourly_updated,
+                    frozenset({"hourly"})
+                )
+            )
     
     @property
     def should_poll(self):
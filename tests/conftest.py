@@ -0,0 +1,6 @@
+"""Shared pytest setup: make the integration and the bench helpers importable."""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT), str(ROOT / "bench")]
@@ -0,0 +1,56 @@
+"""Tests for the publish-rate tracker used by adaptive scheduling."""
+from datetime import datetime, timezone
+
+from custom_components.heweather_v7_key.adaptive import PublishRateTracker
+from custom_components.heweather_v7_key.const import ADAPTIVE_MIN_INTERVAL, ADAPTIVE_PUBLISH_LAG
+
+def _simulate(period, ceiling, phase=0.0, polls=60):
+    """Poll a source publishing every ``period`` seconds; return the lags after each publish."""
+    tracker = PublishRateTracker()
+    now = 1_700_000_000.0 + 17
+    lags = []
+    for _ in range(polls):
+        published = now // period * period
+        tracker.observe(datetime.fromtimestamp(published, timezone.utc).isoformat())
+        lags.append(now - published)
+        now += tracker.next_delay(ceiling, now, phase)
+    return lags
+
+def test_unknown_period_returns_ceiling():
+    tracker = PublishRateTracker()
+    assert tracker.next_delay(900, 0) == 900
+    tracker.observe("2024-01-01T10:00+08:00")
+    assert tracker.period is None
+    assert tracker.next_delay(900, 0) == 900
+
+def test_period_is_median_gap():
+    tracker = PublishRateTracker()
+    for minute in ("00", "10", "20", "50"):
+        tracker.observe(f"2024-01-01T10:{minute}+08:00")
+    assert tracker.period == 600
+
+def test_converges_to_publish_lag():
+    lags = _simulate(600, 900)
+    assert all(round(lag) == ADAPTIVE_PUBLISH_LAG for lag in lags[-10:])
+
+def test_never_exceeds_ceiling_or_floor():
+    tracker = PublishRateTracker()
+    tracker.observe("2024-01-01T10:00+00:00")
+    tracker.observe("2024-01-01T11:00+00:00")
+    published = datetime.fromisoformat("2024-01-01T11:00+00:00").timestamp()
+    assert tracker.next_delay(900, published) == 900
+    assert tracker.next_delay(7200, published + 3600 + ADAPTIVE_PUBLISH_LAG - 1) == ADAPTIVE_MIN_INTERVAL
+
+def test_unchanged_data_backs_off():
+    tracker = PublishRateTracker()
+    tracker.observe("2024-01-01T10:00+00:00")
+    tracker.observe("2024-01-01T10:10+00:00")
+    late = datetime.fromisoformat("2024-01-01T10:30+00:00").timestamp()
+    first = tracker.next_delay(3600, late)
+    tracker.observe("2024-01-01T10:10+00:00")
+    assert tracker.unchanged_polls == 1
+    assert tracker.next_delay(3600, late) == 2 * first
+
+def test_phase_spreads_polls():
+    assert round(_simulate(3600, 3600, 0.0)[-1]) == ADAPTIVE_PUBLISH_LAG
+    assert round(_simulate(3600, 3600, 0.5)[-1]) > ADAPTIVE_PUBLISH_LAG + 300
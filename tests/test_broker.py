@@ -0,0 +1,59 @@
+"""Tests for request coalescing and conditional requests in the broker."""
+import asyncio
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.heweather_v7_key.broker import async_get_broker
+from custom_components.heweather_v7_key.const import DOMAIN
+from custom_components.heweather_v7_key.session import async_close_session
+from mock_server import MockQWeatherServer
+
+async def _with_server(tmp_path, test, **server_options):
+    server = MockQWeatherServer(latency=0.05, **server_options)
+    base_url = await server.start()
+    hass = HomeAssistant(str(tmp_path))
+    hass.data[DOMAIN] = {}
+    try:
+        await test(hass, base_url, server)
+    finally:
+        await async_close_session(hass)
+        await server.stop()
+
+def test_identical_requests_are_coalesced(tmp_path):
+    async def test(hass, base_url, server):
+        broker = async_get_broker(hass)
+        broker.cache_ttl = 0
+        url = f"{base_url}/v7/weather/now?location=101010100&key=k"
+        # 参数顺序不同的同一请求也只发出一次
+        other = f"{base_url}/v7/weather/now?key=k&location=101010100"
+        results = await asyncio.gather(*(broker.async_get_json(u) for u in [url] * 9 + [other]))
+        assert server.requests == 1
+        assert broker.network_requests == 1 and broker.coalesced_requests == 9
+        assert all(result is results[0] for result in results)
+
+    asyncio.run(_with_server(tmp_path, test))
+
+def test_cache_and_not_modified(tmp_path):
+    async def test(hass, base_url, server):
+        broker = async_get_broker(hass)
+        url = f"{base_url}/v7/air/now?location=101010100&key=k"
+        first = await broker.async_get_json(url)
+        assert await broker.async_get_json(url) is first
+        assert broker.cache_hits == 1 and server.requests == 1
+
+        # 缓存过期后发送条件请求，未变化时返回同一对象
+        broker.cache_ttl = 0
+        broker._cache.clear()
+        stats = {}
+        assert await broker.async_get_json(url, stats=stats) is first
+        assert server.not_modified == 1 and stats["not_modified"] == 1
+
+    asyncio.run(_with_server(tmp_path, test))
+
+def test_unconditional_requests_keep_no_validator(tmp_path):
+    async def test(hass, base_url, server):
+        broker = async_get_broker(hass)
+        await broker.async_get_json(f"{base_url}/v2/city/lookup?location=116.40,39.90&key=k", conditional=False)
+        assert not broker._validators
+
+    asyncio.run(_with_server(tmp_path, test))
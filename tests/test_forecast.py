@@ -0,0 +1,30 @@
+"""Tests for the hourly forecast ring buffer."""
+from custom_components.heweather_v7_key.forecast import HourlyForecastStore
+from custom_components.heweather_v7_key.models import HourlyForecast
+
+def _hour(epoch_hour, temp=20):
+    return HourlyForecast(
+        fx_time=str(epoch_hour), epoch_hour=epoch_hour, text="晴", temp=temp, pop=None,
+        precip=None, wind_bearing=None, wind_speed=None, humidity=None, pressure=None,
+        cloud=None, dew=None,
+    )
+
+def test_merge_overwrites_in_place_and_drops_past_hours(monkeypatch):
+    store = HourlyForecastStore(24)
+    now = 500_000
+    monkeypatch.setattr(HourlyForecastStore, "current_hour", staticmethod(lambda: now))
+
+    assert store.merge([_hour(now + offset) for offset in range(24)])
+    assert store.version == 1
+    assert [record.epoch_hour for record in store.upcoming()] == list(range(now, now + 24))
+
+    # 相同数据不改变版本
+    assert not store.merge([_hour(now + offset) for offset in range(24)])
+    assert store.version == 1
+
+    # 两小时后：过去的小时被丢弃，更新的小时原地覆盖，超出容量的被忽略
+    now += 2
+    assert store.merge([_hour(now, temp=25), _hour(now + 30)])
+    upcoming = store.upcoming()
+    assert upcoming[0].epoch_hour == now and upcoming[0].temp == 25
+    assert [record.epoch_hour for record in upcoming] == list(range(now, now + 22))
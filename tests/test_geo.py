@@ -0,0 +1,16 @@
+"""Tests for the geohash helpers used by location tracking."""
+from custom_components.heweather_v7_key.geo import cell_coordinates, geohash_encode, geohash_center
+
+def test_known_geohash():
+    # 参考值：57.64911,10.40744 -> u4pruydqqvj
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+def test_center_round_trip():
+    cell = geohash_encode(39.92, 116.41)
+    latitude, longitude = geohash_center(cell)
+    assert geohash_encode(latitude, longitude) == cell
+    assert abs(latitude - 39.92) < 0.05 and abs(longitude - 116.41) < 0.05
+
+def test_cell_coordinates_format():
+    longitude, latitude = cell_coordinates(geohash_encode(39.92, 116.41)).split(",")
+    assert len(longitude.split(".")[1]) == 2 and len(latitude.split(".")[1]) == 2
@@ -0,0 +1,78 @@
+"""Tests for the rolling time series and the history statistics."""
+import random
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.heweather_v7_key.history import HeWeatherHistory, TimeSeries
+
+def _brute_force(samples):
+    """Return (min, max, mean, slope per hour) computed from scratch."""
+    values = [value for _, value in samples]
+    hours = [(timestamp - samples[0][0]) / 3600 for timestamp, _ in samples]
+    count = len(samples)
+    mean_t = sum(hours) / count
+    mean_v = sum(values) / count
+    denominator = sum((hour - mean_t) ** 2 for hour in hours)
+    slope = sum((hour - mean_t) * (value - mean_v) for hour, value in zip(hours, values)) / denominator
+    return min(values), max(values), mean_v, slope
+
+def test_window_and_capacity_eviction_match_brute_force():
+    rng = random.Random(1)
+    series = TimeSeries(capacity=50, window=3600 * 6)
+    samples = []
+    timestamp = 1_700_000_000.0
+    for _ in range(500):
+        timestamp += rng.choice((300, 600, 900, 1800))
+        value = rng.uniform(990, 1030)
+        series.append(timestamp, value)
+        samples.append((timestamp, value))
+        # 只保留窗口内且不超过容量的样本
+        window = [s for s in samples if s[0] >= timestamp - series.window][-series.capacity:]
+        assert len(series) == len(window)
+        if len(window) >= 2:
+            minimum, maximum, mean, slope = _brute_force(window)
+            assert series.minimum == minimum
+            assert series.maximum == maximum
+            assert series.mean == pytest.approx(mean)
+            assert series.slope == pytest.approx(slope, rel=1e-6, abs=1e-9)
+
+def test_value_at_and_delta():
+    series = TimeSeries()
+    for index in range(7):
+        series.append(1_700_000_000 + index * 1800, 1000 + index)
+    assert series.value_at(1_700_000_000 - 1) is None
+    assert series.value_at(1_700_000_000 + 1900) == 1001
+    assert series.delta(3 * 3600) == 6
+    assert series.delta(4 * 3600) is None
+
+def test_empty_series():
+    series = TimeSeries()
+    assert len(series) == 0
+    assert series.minimum is None and series.maximum is None
+    assert series.mean is None and series.slope is None
+    assert series.delta(3600) is None
+
+def _current(timestamp, pressure):
+    fields = dict.fromkeys(("temp", "feels_like", "humidity", "precip", "vis", "cloud", "dew", "wind_speed"), 1)
+    obs_time = datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+    return SimpleNamespace(obs_time=obs_time, pressure=pressure, **fields)
+
+def test_pressure_trend_uses_three_hour_change():
+    history = HeWeatherHistory()
+    start = 1_700_000_000
+    # 24小时内整体上升，最近3小时下降
+    for index in range(97):
+        pressure = 1010 + (index if index < 84 else 168 - index) * 0.1
+        history.record("current", _current(start + index * 900, pressure))
+    assert history.summary("current", "pressure")["slope_per_hour"] > 0
+    assert history.statistic("current", "pressure", "trend") == "falling"
+    assert history.statistic("current", "pressure", "delta_3h") == -1.2
+
+def test_repeated_observation_is_ignored():
+    history = HeWeatherHistory()
+    history.record("current", _current(1_700_000_000, 1010))
+    history.record("current", _current(1_700_000_000, 1020))
+    assert history.summary("current", "pressure")["samples"] == 1
+    assert history.statistic("current", "pressure", "trend") is None
@@ -0,0 +1,61 @@
+"""Tests for parsing API payloads into records."""
+from custom_components.heweather_v7_key.models import (
+    PARSERS,
+    AirQuality,
+    CurrentWeather,
+    HourlyData,
+    IndicesData,
+    MinutelyData,
+    _number,
+)
+from fixtures import build_payload
+
+def test_number():
+    assert _number("12") == 12 and isinstance(_number("12"), int)
+    assert _number("0.5") == 0.5
+    assert _number("") is None and _number(None) is None and _number("NA") is None
+
+def test_current_weather():
+    record = CurrentWeather.from_api({
+        "updateTime": "u",
+        "now": {"temp": "21", "windScale": "3", "pressure": "1012"},
+        "refer": {"sources": ["QWeather"]},
+    })
+    assert record.temp == 21 and record.pressure == 1012
+    assert record.humidity is None and record.wind_scale == "3"
+    assert record.sources == ("QWeather",)
+
+def test_hourly_skips_invalid_times():
+    record = HourlyData.from_api({"hourly": [
+        {"fxTime": "2024-01-01T10:00+08:00", "temp": "20"},
+        {"fxTime": "bad"},
+    ]})
+    assert len(record.hours) == 1
+    assert record.hours[0].epoch_hour == 1704074400 // 3600
+
+def test_minutely_slots():
+    record = MinutelyData.from_api({"minutely": [
+        {"fxTime": "2024-01-01T10:00+08:00", "precip": "0.10"},
+        {"fxTime": "", "precip": ""},
+    ]})
+    assert record.start_time == 1704074400 and record.slots == (0.1, 0.0)
+    assert MinutelyData.from_api({"minutely": []}).slots == ()
+
+def test_indices_are_keyed_by_type():
+    record = IndicesData.from_api({"daily": [{"type": "1", "name": "运动指数", "level": "2"}]})
+    assert record.by_type["1"].name == "运动指数"
+
+def test_parsers_accept_mock_payloads():
+    paths = {
+        "current": "/v7/weather/now",
+        "forecast": "/v7/weather/7d",
+        "hourly": "/v7/weather/24h",
+        "minutely": "/v7/minutely/5m",
+        "warning": "/v7/warning/now",
+        "air": "/v7/air/now",
+        "indices": "/v7/indices/1d",
+    }
+    for endpoint_name, path in paths.items():
+        record = PARSERS[endpoint_name](build_payload(path, "116.40,39.90"))
+        assert record.update_time
+    assert isinstance(PARSERS["air"](build_payload("/v7/air/now", "101010100")), AirQuality)
@@ -0,0 +1,39 @@
+"""Tests for the precipitation nowcast and its rain transitions."""
+from custom_components.heweather_v7_key.models import MinutelyData
+from custom_components.heweather_v7_key.nowcast import PrecipitationNowcast
+
+START = "2024-01-01T10:00+00:00"
+START_TS = 1704103200.0
+
+def _record(update_time, precip):
+    return MinutelyData.from_api({
+        "updateTime": update_time,
+        "summary": "s",
+        "minutely": [
+            {"fxTime": START if index == 0 else "", "precip": str(value)}
+            for index, value in enumerate(precip)
+        ],
+    })
+
+def test_rain_start_and_end_events():
+    nowcast = PrecipitationNowcast()
+    dry = [0.0] * 24
+    assert nowcast.merge(_record("u1", dry)) == []
+    assert nowcast.minutes_until_rain(START_TS) is None
+
+    rain = [0.0] * 6 + [0.2] * 6 + [0.0] * 12
+    events = nowcast.merge(_record("u2", rain))
+    assert events == [("rain_start", START_TS + 1800), ("rain_end", START_TS + 3600)]
+    assert nowcast.minutes_until_rain(START_TS) == 30
+    assert nowcast.minutes_until_rain(START_TS + 2000) == 0
+    assert nowcast.minutes_until_rain(START_TS + 3600) is None
+    assert nowcast.rain_end_datetime().timestamp() == START_TS + 3600
+
+    # 同一预报再次合并不产生事件；持续降雨不重复触发开始事件
+    assert nowcast.merge(_record("u2", rain)) == []
+    assert nowcast.merge(_record("u3", rain)) == []
+
+def test_empty_record_is_ignored():
+    nowcast = PrecipitationNowcast()
+    assert nowcast.merge(MinutelyData.from_api({"updateTime": "u1", "minutely": []})) == []
+    assert nowcast.update_time is None
@@ -0,0 +1,68 @@
+"""Tests for the token bucket and the daily quota planner."""
+import asyncio
+import math
+from datetime import datetime
+
+import pytest
+
+from custom_components.heweather_v7_key import ratelimit
+from custom_components.heweather_v7_key.ratelimit import HeWeatherRateLimiter
+
+ALL_ENDPOINTS = ("current", "forecast", "warning", "air", "indices", "hourly")
+
+@pytest.fixture
+def midnight(monkeypatch):
+    """Plan as if the whole day were still ahead."""
+    moment = datetime(2024, 1, 1, 0, 0, 0)
+    monkeypatch.setattr(ratelimit.dt_util, "now", lambda: moment)
+
+def test_burst_covers_registered_endpoints():
+    limiter = HeWeatherRateLimiter(1000)
+    for owner in range(10):
+        limiter.async_register_demand(owner, dict.fromkeys(ALL_ENDPOINTS, 900))
+    assert limiter.burst == 60
+
+    async def acquire_all():
+        return [await limiter.async_acquire() for _ in range(61)]
+
+    results = asyncio.run(acquire_all())
+    assert results.count(True) == 60
+    assert limiter.retry_after() == pytest.approx(86.4, abs=1)
+
+    limiter.async_unregister_demand(0)
+    assert limiter.burst == 54
+
+def test_daily_budget_refuses(midnight):
+    limiter = HeWeatherRateLimiter(2, burst=5)
+
+    async def acquire_all():
+        return [await limiter.async_acquire() for _ in range(3)]
+
+    results = asyncio.run(acquire_all())
+    assert results == [True, True, False]
+    assert limiter.retry_after() is None
+    assert limiter.remaining_today == 0
+
+def test_plan_within_budget_does_not_throttle(midnight):
+    limiter = HeWeatherRateLimiter(1000)
+    limiter.async_register_demand("a", {"current": 900, "forecast": 10800})
+    limiter._plan()
+    assert limiter.plan_summary() == {}
+
+def test_plan_stretches_and_pauses_low_priority_first(midnight):
+    limiter = HeWeatherRateLimiter(1000)
+    # 约 96*6 + 24 次/天/城市，5个城市远超预算
+    for owner in range(5):
+        limiter.async_register_demand(owner, {
+            "warning": 900, "current": 900, "air": 900, "hourly": 900, "indices": 900, "forecast": 3600,
+        })
+    limiter._plan()
+    scales = limiter._scales
+    assert scales["indices"] == math.inf
+    assert "warning" not in scales
+    planned = sum(
+        calls / scales.get(name, 1)
+        for demand in limiter._demands.values()
+        for name, calls in demand.items()
+    )
+    assert planned <= 1000 * ratelimit.QUOTA_SAFETY_MARGIN + 1e-6
@@ -0,0 +1,59 @@
+"""Tests for the circuit breaker state machine."""
+from custom_components.heweather_v7_key import retry
+from custom_components.heweather_v7_key.retry import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    HeWeatherCircuitBreakers,
+)
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_open_half_open_close(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(retry.time, "monotonic", clock)
+    breaker = CircuitBreaker("x", failure_threshold=3, cooldown=300)
+    for _ in range(3):
+        assert breaker.can_request()
+        breaker.record_failure()
+    assert breaker.state == STATE_OPEN and not breaker.can_request()
+
+    clock.now += 300
+    assert breaker.can_request() and breaker.state == STATE_HALF_OPEN
+    breaker.on_request()
+    # 探测请求进行中不放行第二个
+    assert not breaker.can_request()
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+
+    clock.now += 300
+    assert breaker.can_request()
+    breaker.on_request()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED and breaker.failures == 0
+
+def test_release_allows_next_probe(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(retry.time, "monotonic", clock)
+    breaker = CircuitBreaker("x", failure_threshold=1, cooldown=300)
+    breaker.record_failure()
+    clock.now += 300
+    assert breaker.can_request()
+    breaker.on_request()
+    breaker.release()
+    assert breaker.can_request()
+
+def test_api_failures_keep_host_closed():
+    breakers = HeWeatherCircuitBreakers()
+    for _ in range(10):
+        breakers.record_failure("h", "/v7/air/now", host_failure=False)
+    states = breakers.states("h", ["/v7/air/now", "/v7/weather/now"])
+    assert states == {"h": STATE_CLOSED, "h/v7/air/now": STATE_OPEN, "h/v7/weather/now": STATE_CLOSED}
+    assert not breakers.allow_request("h", "/v7/air/now")
+    assert breakers.allow_request("h", "/v7/weather/now")
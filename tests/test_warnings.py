@@ -0,0 +1,24 @@
+"""Tests for diffing active warnings by id."""
+from custom_components.heweather_v7_key.models import WeatherWarning
+from custom_components.heweather_v7_key.warnings import WarningIndex
+
+def _warning(warning_id, color="Blue"):
+    return WeatherWarning.from_api({"id": warning_id, "title": warning_id, "severityColor": color})
+
+def test_added_updated_removed():
+    index = WarningIndex()
+    added, updated, removed = index.update([_warning("a"), _warning("b")])
+    assert [w.id for w in added] == ["a", "b"] and updated == [] and removed == []
+
+    added, updated, removed = index.update([_warning("a", "Red"), _warning("c")])
+    assert [w.id for w in added] == ["c"]
+    assert [(w.id, w.severity_color) for w in updated] == [("a", "Red")]
+    assert [w.id for w in removed] == ["b"]
+
+    assert index.update([_warning("a", "Red"), _warning("c")]) == ([], [], [])
+    assert set(index.warnings) == {"a", "c"}
+
+def test_warnings_without_id_are_skipped():
+    index = WarningIndex()
+    added, _, _ = index.update([_warning("")])
+    assert added == [] and index.warnings == {}